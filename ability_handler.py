@@ -12,6 +12,29 @@ import os
 import random
 
 
+# Weather that deals 1/16 chip at end of turn -> types that are immune to it
+_WEATHER_CHIP_IMMUNE = {
+    'sandstorm': frozenset({'rock', 'ground', 'steel'}),
+    'hail': frozenset({'ice'}),
+}
+
+
+# Bit flags for abilities the battle engine checks by name on hot paths.
+# Pokemon.ability_flags holds these, computed whenever its ability is set.
+ABILITY_LEVITATE = 1
+
+_ABILITY_FLAGS = {
+    'levitate': ABILITY_LEVITATE,
+}
+
+
+def ability_flags(ability_id: Optional[str]) -> int:
+    """Bit flags for an ability id or display name ('Levitate', 'levitate'...); 0 if none apply"""
+    if not ability_id:
+        return 0
+    return _ABILITY_FLAGS.get(re.sub(r'[-_\s]+', '', str(ability_id).strip().lower()), 0)
+
+
 class AbilityHandler:
     """Handles ability triggers and effects"""
     def __init__(self, abilities_file: str = 'data/abilities.json', overrides_file: str = 'data/ability_overrides.json'):
@@ -156,25 +179,29 @@ class AbilityHandler:
         if not weather:
             return None
         w = (weather or '').lower()
+        immune = _WEATHER_CHIP_IMMUNE.get(w)
+        if immune is None:
+            # Rain, sun, snow: no chip damage
+            return None
         
         # Get Pokemon types for immunity checks
         types = self._pokemon_types(pokemon)
         
         # Sandstorm chip: non Rock/Ground/Steel take 1/16
         if w == 'sandstorm':
-            if not any(t in ('rock', 'ground', 'steel') for t in types):
-                if getattr(pokemon, 'current_hp', 0) > 0:
-                    dmg = max(1, getattr(pokemon, 'max_hp', 1) // 16)
+            if immune.isdisjoint(types):
+                if pokemon.current_hp > 0:
+                    dmg = max(1, pokemon.max_hp // 16)
                     pokemon.current_hp = max(0, pokemon.current_hp - dmg)
-                    return f"{getattr(pokemon, 'species_name', 'The Pokémon')} is buffeted by the sandstorm! (-{dmg} HP)"
+                    return f"{pokemon.species_name} is buffeted by the sandstorm! (-{dmg} HP)"
         
         # Hail chip: non Ice types take 1/16
         elif w == 'hail':
-            if 'ice' not in types:
-                if getattr(pokemon, 'current_hp', 0) > 0:
-                    dmg = max(1, getattr(pokemon, 'max_hp', 1) // 16)
+            if immune.isdisjoint(types):
+                if pokemon.current_hp > 0:
+                    dmg = max(1, pokemon.max_hp // 16)
                     pokemon.current_hp = max(0, pokemon.current_hp - dmg)
-                    return f"{getattr(pokemon, 'species_name', 'The Pokémon')} is buffeted by the hail! (-{dmg} HP)"
+                    return f"{pokemon.species_name} is buffeted by the hail! (-{dmg} HP)"
         
         # Snow is like Hail but without damage in newer gens
         # For now we'll keep it simple
@@ -10,9 +10,14 @@ import re
 import random
 import json
 import uuid
-import math
-from typing import Dict, List, Optional, Tuple, Any
+from fractions import Fraction
+import inspect
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, Optional, Sequence, Tuple, Any
 from ruleset_handler import RulesetHandler
+from ability_handler import ABILITY_LEVITATE
+from database import TYPE_BITS
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -41,7 +46,7 @@ class BattleFormat(Enum):
     MULTI = "multi"  # 2v2 with partners
 
 
-@dataclass
+@dataclass(slots=True)
 class Battler:
     """Represents one side of a battle (trainer or opponent)"""
     battler_id: int  # Discord ID for trainers, negative for NPCs/wild
@@ -56,17 +61,34 @@ class Battler:
     # For trainer battles
     trainer_class: Optional[str] = None  # "Youngster", "Ace Trainer", etc.
     prize_money: int = 0
-    
-    def get_active_pokemon(self) -> List[Any]:
+
+    # Active-Pokemon cache; bump _active_version whenever active_positions changes
+    _active_version: int = field(default=0, init=False, repr=False)
+    _cached_version: int = field(default=-1, init=False, repr=False)
+    _active_cache: Tuple[Any, ...] = field(default=(), init=False, repr=False)
+    def get_active_pokemon(self) -> Tuple[Any, ...]:
         """Get currently active Pokemon"""
-        return [self.party[i] for i in self.active_positions if i < len(self.party)]
+        if self._cached_version != self._active_version:
+            party = self.party
+            self._active_cache = tuple(party[i] for i in self.active_positions if i < len(party))
+            self._cached_version = self._active_version
+        return self._active_cache
+
+    def get_active_first(self) -> Any:
+        """Get the lead active Pokemon (singles fast path)"""
+        return self.party[self.active_positions[0]]
+
+    def set_active(self, slot: int, party_position: int):
+        """Put the Pokemon at party_position into the given active slot"""
+        self.active_positions[slot] = party_position
+        self._active_version += 1
     
     def has_usable_pokemon(self) -> bool:
         """Check if battler has any Pokemon that can still fight"""
         return any(p.current_hp > 0 for p in self.party)
 
 
-@dataclass 
+@dataclass(slots=True)
 class BattleState:
     """Complete state of an ongoing battle"""
     battle_id: str
@@ -100,7 +122,7 @@ class BattleState:
     opponent_screens: Dict[str, int] = field(default_factory=dict)
     
     # Turn actions (stored for simultaneous resolution)
-    pending_actions: Dict[str, 'BattleAction'] = field(default_factory=dict)  # battler_id -> action
+    pending_actions: Dict[int, 'BattleAction'] = field(default_factory=dict)  # battler_id -> action
     
     # Battle log
     battle_log: List[str] = field(default_factory=list)
@@ -117,44 +139,200 @@ class BattleState:
     is_ranked: bool = False
     ranked_context: Dict[str, Any] = field(default_factory=dict)
 
+    # Set by BattleEngine.start_battle
+    entry_messages: List[str] = field(default_factory=list)
+    ruleset: Optional[str] = None
+
+    # battler_id -> Battler lookups, filled in by BattleEngine.start_battle
+    _battler_by_id: Dict[int, Battler] = field(default_factory=dict, init=False, repr=False)
+    _opposite: Dict[int, Battler] = field(default_factory=dict, init=False, repr=False)
+    # Human-controlled battler ids whose action must be in before the turn resolves
+    _required_action_ids: Tuple[int, ...] = field(default=(), init=False, repr=False)
+    # Per-battle RNG for engine-side rolls (AI picks, speed ties, Focus Band, fleeing)
+    _rng: random.Random = field(default_factory=random.Random, init=False, repr=False)
+
+
+def _ratio(value) -> Tuple[int, int]:
+    """Turn a multiplier from items.json (1.5, 1.3, 6.25 / 100...) into an integer (num, den) pair."""
+    frac = Fraction(value).limit_denominator(1000)
+    return frac.numerator, frac.denominator
+
+
+def _shuffle_tied(rng: random.Random, tied: List[Any]):
+    """Randomize, in place, actions that tie on priority and speed"""
+    if len(tied) == 2:
+        # One coin flip, so a two-way tie costs a single draw in singles and doubles alike
+        if rng.random() < 0.5:
+            tied.reverse()
+    else:
+        rng.shuffle(tied)
+
+
+_UNIT = (1, 1)
+
+# Entry hazard tables indexed by layer count
+_SPIKES_FRAC = (None, (1, 8), (1, 6), (1, 4))
+_TSPIKES_STATUS = (None, 'psn', 'tox')
+_FLYING = TYPE_BITS['flying']
+_POISON = TYPE_BITS['poison']
+_STEEL = TYPE_BITS['steel']
+
+# Suffixes appended to the "X used Y!" line
+_CRIT = " It's a critical hit!"
+_SUPER = " It's super effective!"
+_NVE = " It's not very effective..."
+_NOEFF = " It doesn't affect the target..."
+
+# Shared no-op result for message-returning hooks, so the common case allocates nothing
+_EMPTY: Tuple[str, ...] = ()
+
+
+def _unit_power(move_type: str, category: str) -> Tuple[int, int]:
+    return _UNIT
+
+
+def _unit_defense(category: str) -> Tuple[int, int]:
+    return _UNIT
+
+
+# (item, power_fn, defense_fn, speed_multiplier) for a Pokemon with nothing usable held
+_NO_ITEM = (None, _unit_power, _unit_defense, 1.0)
+
 
 class HeldItemManager:
     """Utility helper for held item effects."""
 
     def __init__(self, items_db):
         self.items_db = items_db
+        # item_id -> the manager's own copy of the item dict, with the normalized effect under
+        # '_effect'; items.json is loaded once, so no invalidation needed
+        self._item_cache: Dict[str, Optional[Dict]] = {}
+        # move type as stored ("Fire") -> lower-case form the type-boost items compare against
+        self._move_types: Dict[str, str] = {}
+
+        # Item ids that can do anything in each hook; a held item outside the set skips the hook
+        restricts, damage, after_damage, end_of_turn, speed = set(), set(), set(), set(), set()
+        for item_id, item in (getattr(items_db, 'data', None) or {}).items():
+            effect = item.get('effect_data') or {}
+            stat = effect.get('stat')
+            if effect.get('locks_move') or effect.get('blocks_status_moves'):
+                restricts.add(item_id)
+            if ('power_multiplier' in effect or stat in ('attack', 'sp_attack', 'sp_defense')
+                    or effect.get('prevents_ko') or effect.get('requires_full_hp') or 'activation_chance' in effect):
+                damage.add(item_id)
+            if effect.get('locks_move') or effect.get('recoil_percent'):
+                after_damage.add(item_id)
+            if effect.get('heal_percent'):
+                end_of_turn.add(item_id)
+            if stat == 'speed':
+                speed.add(item_id)
+        self._restricts_moves = frozenset(restricts)
+        self._damage_items = frozenset(damage)
+        self._after_damage_items = frozenset(after_damage)
+        self._end_of_turn_items = frozenset(end_of_turn)
+        self._speed_items = frozenset(speed)
 
     def _is_consumed(self, pokemon, item_id: str) -> bool:
-        consumed = getattr(pokemon, '_consumed_items', set())
-        return item_id in consumed
+        # A Pokemon only ever holds one item, so remembering which id was used up is enough
+        return pokemon._consumed_item == item_id
 
     def _consume(self, pokemon, item_id: str):
-        consumed = getattr(pokemon, '_consumed_items', set())
-        consumed.add(item_id)
-        pokemon._consumed_items = consumed
-
-    def _get_item(self, pokemon):
+        pokemon._consumed_item = item_id
+        self.invalidate(pokemon)
+
+    def invalidate(self, pokemon):
+        """Drop the resolved held item cached on this Pokemon."""
+        pokemon._consumed_version += 1
+
+    def _lookup_item(self, item_id: str) -> Optional[Dict]:
+        cache = self._item_cache
+        item = cache.get(item_id)
+        if item is None:
+            item = self.items_db.get_item(item_id)
+            if item is not None:
+                # Copies, so the engine-only keys never show up in the shared items_db data
+                effect = dict(item.get('effect_data') or {})
+                item = dict(item, _effect=effect)
+                if effect.get('type'):
+                    effect['_type_lower'] = effect['type'].lower()
+                # Fixed-point (num, den) forms so the damage path stays in integers
+                effect['_power'] = _ratio(effect.get('power_multiplier', 1))
+                effect['_stat'] = _ratio(effect.get('multiplier', 1))
+                effect['_recoil'] = _ratio(Fraction(str(effect.get('recoil_percent') or 0)) / 100)
+                effect['_heal'] = _ratio(Fraction(str(effect.get('heal_percent') or 0)) / 100)
+            cache[item_id] = item
+        return item
+
+    def _resolve(self, pokemon) -> Tuple:
+        """Return (item, power_fn, defense_fn, speed_multiplier) for the Pokemon's held item."""
         if not self.items_db:
-            return None
-        item_id = getattr(pokemon, 'held_item', None)
+            return _NO_ITEM
+        item_id = pokemon.held_item
         if not item_id:
-            return None
-        if self._is_consumed(pokemon, item_id):
-            return None
-        return self.items_db.get_item(item_id)
+            return _NO_ITEM
+        # Cached on the Pokemon as (held_item, version, entry); switch-in and consumption bump the version
+        version = pokemon._consumed_version
+        cached = pokemon._item_cache
+        if cached is not None and cached[0] == item_id and cached[1] == version:
+            return cached[2]
+        item = None if self._is_consumed(pokemon, item_id) else self._lookup_item(item_id)
+        entry = self._specialize(item)
+        pokemon._item_cache = (item_id, version, entry)
+        return entry
+
+    def _get_item(self, pokemon):
+        return self._resolve(pokemon)[0]
+
+    @staticmethod
+    def _specialize(item) -> Tuple:
+        """Build straight-line multiplier functions for one item so the damage path skips the effect lookups."""
+        if not item:
+            return _NO_ITEM
+        effect = item['_effect']
+        boost_type = effect.get('_type_lower')
+        power = effect['_power']
+        stat = effect.get('stat')
+        stat_mult = effect['_stat']
+        stat_category = {'attack': 'physical', 'sp_attack': 'special'}.get(stat)
+
+        if stat_category is None:
+            if boost_type is None:
+                power_fn = _unit_power if power == _UNIT else (lambda move_type, category: power)
+            else:
+                power_fn = lambda move_type, category: power if move_type == boost_type else _UNIT
+        else:
+            stat_boost = (power[0] * stat_mult[0], power[1] * stat_mult[1])
+            if boost_type is None:
+                power_fn = lambda move_type, category: stat_boost if category == stat_category else power
+            else:
+                def power_fn(move_type, category):
+                    if move_type == boost_type:
+                        return stat_boost if category == stat_category else power
+                    return stat_mult if category == stat_category else _UNIT
+
+        if stat == 'sp_defense' and stat_mult[0] > stat_mult[1]:
+            inverse = (stat_mult[1], stat_mult[0])
+            defense_fn = lambda category: inverse if category == 'special' else _UNIT
+        else:
+            defense_fn = _unit_defense
+
+        speed_multiplier = effect.get('multiplier', 1.0) if stat == 'speed' else 1.0
+        return item, power_fn, defense_fn, speed_multiplier
 
     # -------- Restrictions / tracking --------
     def check_move_restrictions(self, pokemon, move_data) -> Optional[str]:
+        if pokemon.held_item not in self._restricts_moves:
+            return None
         item = self._get_item(pokemon)
         if not item:
             return None
-        effect = item.get('effect_data') or {}
+        effect = item['_effect']
 
         if effect.get('blocks_status_moves') and move_data.get('category') == 'status':
             return f"{pokemon.species_name} can't use status moves while holding {item.get('name', item['id'])}!"
 
         if effect.get('locks_move'):
-            locked = getattr(pokemon, '_choice_locked_move', None)
+            locked = pokemon._choice_locked_move
             move_id = move_data.get('id') or move_data.get('move_id')
             if locked and move_id and move_id != locked:
                 move_name = move_data.get('name', move_id).title()
@@ -163,76 +341,64 @@ class HeldItemManager:
         return None
 
     def register_move_use(self, pokemon, move_data):
+        if not pokemon.held_item:
+            return
         item = self._get_item(pokemon)
         if not item:
             return
-        effect = item.get('effect_data') or {}
+        effect = item['_effect']
         if effect.get('locks_move'):
             move_id = move_data.get('id') or move_data.get('move_id')
             pokemon._choice_locked_move = move_id
 
     def clear_choice_lock(self, pokemon):
-        if hasattr(pokemon, '_choice_locked_move'):
-            delattr(pokemon, '_choice_locked_move')
+        pokemon._choice_locked_move = None
 
     # -------- Offensive modifiers --------
-    def _power_multiplier(self, pokemon, move_data) -> float:
-        item = self._get_item(pokemon)
-        if not item:
-            return 1.0
-        effect = item.get('effect_data') or {}
-        multiplier = 1.0
-        move_type = (move_data.get('type') or '').lower()
+    def _apply_item_damage_mods(self, attacker, defender, move_data, damage: int) -> int:
+        """Apply attacker power boosts and defender stat items in one pass."""
         category = move_data.get('category')
 
-        if effect.get('type'):
-            if move_type == effect['type'].lower():
-                multiplier *= effect.get('power_multiplier', 1.0)
-        elif 'power_multiplier' in effect:
-            multiplier *= effect.get('power_multiplier', 1.0)
+        # Both sides fold into a single num/den, applied once with round-half-up
+        num = den = 1
 
-        stat = effect.get('stat')
-        stat_mult = effect.get('multiplier', 1.0)
-        if stat == 'attack' and category == 'physical':
-            multiplier *= stat_mult
-        elif stat == 'sp_attack' and category == 'special':
-            multiplier *= stat_mult
+        if attacker.held_item:
+            raw_type = move_data.get('type') or ''
+            move_type = self._move_types.get(raw_type)
+            if move_type is None:
+                move_type = self._move_types[raw_type] = raw_type.lower()
+            num, den = self._resolve(attacker)[1](move_type, category)
 
-        return multiplier
+        if defender.held_item:
+            defense_num, defense_den = self._resolve(defender)[2](category)
+            num *= defense_num
+            den *= defense_den
 
-    def _defense_multiplier(self, pokemon, move_data) -> float:
-        item = self._get_item(pokemon)
-        if not item:
-            return 1.0
-        effect = item.get('effect_data') or {}
-        stat = effect.get('stat')
-        if stat == 'sp_defense' and move_data.get('category') == 'special':
-            return effect.get('multiplier', 1.0)
-        return 1.0
+        if num == den:
+            return damage
+        return max(1, (damage * num + den // 2) // den)
 
-    def modify_damage(self, attacker, defender, move_data, damage: int) -> Tuple[int, List[str]]:
+    def modify_damage(self, attacker, defender, move_data, damage: int, rng=random) -> Tuple[int, Sequence[str]]:
         if damage <= 0:
-            return damage, []
+            return damage, _EMPTY
+        # Most battles have no damage-relevant held item on either side
+        if attacker.held_item not in self._damage_items and defender.held_item not in self._damage_items:
+            return damage, _EMPTY
 
-        messages: List[str] = []
-        damage = int(round(damage * self._power_multiplier(attacker, move_data)))
-        defense_mult = self._defense_multiplier(defender, move_data)
-        if defense_mult > 1:
-            damage = max(1, int(math.ceil(damage / defense_mult)))
+        damage = self._apply_item_damage_mods(attacker, defender, move_data, damage)
 
-        damage, survival_msg = self._try_focus_items(defender, damage)
+        damage, survival_msg = self._try_focus_items(defender, damage, rng)
         if survival_msg:
-            messages.append(survival_msg)
+            return damage, (survival_msg,)
+        return damage, _EMPTY
 
-        return damage, messages
-
-    def _try_focus_items(self, defender, damage: int) -> Tuple[int, Optional[str]]:
+    def _try_focus_items(self, defender, damage: int, rng=random) -> Tuple[int, Optional[str]]:
         if damage < defender.current_hp or defender.current_hp <= 0:
             return damage, None
         item = self._get_item(defender)
         if not item:
             return damage, None
-        effect = item.get('effect_data') or {}
+        effect = item['_effect']
 
         trigger = item.get('trigger')
         if trigger and trigger != 'before_damage':
@@ -246,7 +412,7 @@ class HeldItemManager:
             return damage, None
 
         activation = effect.get('activation_chance')
-        if activation is not None and random.random() > activation:
+        if activation is not None and rng.random() > activation:
             return damage, None
 
         if defender.current_hp <= 1:
@@ -259,49 +425,49 @@ class HeldItemManager:
             self._consume(defender, item['id'])
         return damage, message
 
-    def apply_after_damage(self, attacker, move_data, dealt_damage: int) -> List[str]:
+    def apply_after_damage(self, attacker, move_data, dealt_damage: int) -> Sequence[str]:
+        if attacker.held_item not in self._after_damage_items:
+            return _EMPTY
         item = self._get_item(attacker)
         if not item:
-            return []
+            return _EMPTY
 
         # Choice items lock even on misses
         self.register_move_use(attacker, move_data)
 
         if dealt_damage <= 0:
-            return []
-
-        effect = item.get('effect_data') or {}
-        messages: List[str] = []
+            return _EMPTY
 
-        if effect.get('recoil_percent'):
-            recoil = max(1, int(round(attacker.max_hp * (effect['recoil_percent'] / 100.0))))
-            attacker.current_hp = max(0, attacker.current_hp - recoil)
-            messages.append(f"{attacker.species_name} was hurt by its {item.get('name', item['id'])}! (-{recoil} HP)")
+        effect = item['_effect']
+        if not effect.get('recoil_percent'):
+            return _EMPTY
 
-        return messages
+        recoil_num, recoil_den = effect['_recoil']
+        recoil = max(1, (attacker.max_hp * recoil_num + recoil_den // 2) // recoil_den)
+        attacker.current_hp = max(0, attacker.current_hp - recoil)
+        return (f"{attacker.species_name} was hurt by its {item.get('name', item['id'])}! (-{recoil} HP)",)
 
-    def process_end_of_turn(self, pokemon) -> List[str]:
+    def process_end_of_turn(self, pokemon) -> Sequence[str]:
+        if pokemon.held_item not in self._end_of_turn_items:
+            return _EMPTY
         item = self._get_item(pokemon)
         if not item:
-            return []
-        effect = item.get('effect_data') or {}
+            return _EMPTY
+        effect = item['_effect']
         heal_percent = effect.get('heal_percent')
-        if not heal_percent or getattr(pokemon, 'current_hp', 0) <= 0 or pokemon.current_hp >= pokemon.max_hp:
-            return []
-        heal = max(1, int(round(pokemon.max_hp * (heal_percent / 100.0))))
+        if not heal_percent or pokemon.current_hp <= 0 or pokemon.current_hp >= pokemon.max_hp:
+            return _EMPTY
+        heal_num, heal_den = effect['_heal']
+        heal = max(1, (pokemon.max_hp * heal_num + heal_den // 2) // heal_den)
         pokemon.current_hp = min(pokemon.max_hp, pokemon.current_hp + heal)
-        return [f"{pokemon.species_name} restored health with its {item.get('name', item['id'])}! (+{heal} HP)"]
+        return (f"{pokemon.species_name} restored health with its {item.get('name', item['id'])}! (+{heal} HP)",)
 
     def get_speed_multiplier(self, pokemon) -> float:
-        item = self._get_item(pokemon)
-        if not item:
+        if pokemon.held_item not in self._speed_items:
             return 1.0
-        effect = item.get('effect_data') or {}
-        if effect.get('stat') == 'speed':
-            return effect.get('multiplier', 1.0)
-        return 1.0
+        return self._resolve(pokemon)[3]
 
-@dataclass
+@dataclass(slots=True)
 class BattleAction:
     """A single action taken by a battler"""
     action_type: str  # 'move', 'switch', 'item', 'flee'
@@ -340,18 +506,34 @@ class BattleEngine:
         """
         self.moves_db = moves_db
         self.type_chart = type_chart
+        # Raw attacking -> defending multiplier dict, whether given a TypeChart or the dict itself
+        self._chart = getattr(type_chart, 'chart', type_chart)
         self.species_db = species_db
         self.items_db = items_db
         self.held_item_manager = HeldItemManager(items_db) if items_db else None
+
+        # move_id -> move dict, filled lazily by _move()
+        self._move_cache: Dict[str, Optional[Dict]] = {}
+
+        # action_type -> handler; only _execute_move is a coroutine
+        self._action_dispatch = {
+            'move': self._execute_move,
+            'switch': self._execute_switch,
+            'item': self._execute_item,
+            'flee': self._execute_flee,
+        }
         
         # Initialize enhanced systems
         # Ruleset handler
         self.ruleset_handler = RulesetHandler()
+        self.calculator = None
         if ENHANCED_SYSTEMS_AVAILABLE:
             self.calculator = EnhancedDamageCalculator(moves_db, type_chart)
             self.ability_handler = AbilityHandler('data/abilities.json')
+            self._calculate_damage = self.calculator.calculate_damage_with_effects
             print("✨ Enhanced battle systems loaded!")
         else:
+            self._calculate_damage = self._basic_damage
             print("⚠️ Using basic battle calculator")
         
         # Active battles
@@ -374,7 +556,8 @@ class BattleEngine:
         opponent_is_ai: bool = True,
         is_ranked: bool = False,
         ranked_context: Optional[Dict[str, Any]] = None,
-        **kwargs
+        trainer_class: Optional[str] = None,
+        prize_money: int = 0
     ) -> str:
         """Universal battle starter"""
         battle_id = str(uuid.uuid4())
@@ -417,8 +600,8 @@ class BattleEngine:
             can_switch=(battle_type != BattleType.WILD),  # Wild Pokemon can't switch
             can_use_items=(battle_type == BattleType.TRAINER),
             can_flee=False,
-            trainer_class=kwargs.get('trainer_class'),
-            prize_money=kwargs.get('prize_money', 0)
+            trainer_class=trainer_class,
+            prize_money=prize_money
         )
         
         # Create battle state
@@ -431,6 +614,11 @@ class BattleEngine:
             is_ranked=is_ranked,
             ranked_context=ranked_context or {}
         )
+        battle._battler_by_id = {trainer.battler_id: trainer, opponent.battler_id: opponent}
+        battle._opposite = {trainer.battler_id: opponent, opponent.battler_id: trainer}
+        # Seeded from the global generator so random.seed() still reproduces whole battles
+        battle._rng = random.Random(random.getrandbits(64))
+        battle._required_action_ids = tuple(b.battler_id for b in (trainer, opponent) if not b.is_ai)
         
         # Trigger entry abilities
         # Trigger entry abilities and capture messages
@@ -571,25 +759,20 @@ class BattleEngine:
             return {"error": "Battle is already over"}
         
         # Validate battler
-        if battler_id not in [battle.trainer.battler_id, battle.opponent.battler_id]:
+        if battler_id not in battle._battler_by_id:
             return {"error": "Invalid battler ID"}
         
         # Store action
-        battle.pending_actions[str(battler_id)] = action
+        battle.pending_actions[battler_id] = action
         
         # Check if we have all actions needed
-        required_actions = []
-        if not battle.trainer.is_ai:
-            required_actions.append(str(battle.trainer.battler_id))
-        if not battle.opponent.is_ai:
-            required_actions.append(str(battle.opponent.battler_id))
-        
-        all_actions_ready = all(str(rid) in battle.pending_actions for rid in required_actions)
+        pending = battle.pending_actions
+        waiting = [rid for rid in battle._required_action_ids if rid not in pending]
         
         return {
             "success": True,
-            "waiting_for": [rid for rid in required_actions if str(rid) not in battle.pending_actions],
-            "ready_to_resolve": all_actions_ready
+            "waiting_for": waiting,
+            "ready_to_resolve": not waiting
         }
     
     def generate_ai_action(self, battle_id: str, battler_id: int) -> BattleAction:
@@ -604,8 +787,8 @@ class BattleEngine:
             return None
         
         # Find the battler
-        battler = battle.trainer if battle.trainer.battler_id == battler_id else battle.opponent
-        active_pokemon = battler.get_active_pokemon()[0]  # Get first active (singles for now)
+        battler = battle._battler_by_id[battler_id]
+        active_pokemon = battler.get_active_first()  # Singles for now
         
         # Simple AI: Pick a random move
         usable_moves = [m for m in active_pokemon.moves if m['pp'] > 0]
@@ -618,7 +801,7 @@ class BattleEngine:
                 target_position=0
             )
         
-        chosen_move = random.choice(usable_moves)
+        chosen_move = battle._rng.choice(usable_moves)
         
         return BattleAction(
             action_type='move',
@@ -643,13 +826,13 @@ class BattleEngine:
             return {"error": "Battle not found"}
         
         # Generate AI actions if needed
-        if battle.trainer.is_ai and str(battle.trainer.battler_id) not in battle.pending_actions:
+        if battle.trainer.is_ai and battle.trainer.battler_id not in battle.pending_actions:
             action = self.generate_ai_action(battle_id, battle.trainer.battler_id)
-            battle.pending_actions[str(battle.trainer.battler_id)] = action
+            battle.pending_actions[battle.trainer.battler_id] = action
         
-        if battle.opponent.is_ai and str(battle.opponent.battler_id) not in battle.pending_actions:
+        if battle.opponent.is_ai and battle.opponent.battler_id not in battle.pending_actions:
             action = self.generate_ai_action(battle_id, battle.opponent.battler_id)
-            battle.pending_actions[str(battle.opponent.battler_id)] = action
+            battle.pending_actions[battle.opponent.battler_id] = action
         
         # Clear turn log
         battle.turn_log = []
@@ -664,11 +847,11 @@ class BattleEngine:
         # Execute actions in order
         for action in actions:
             # If the battle is over or the wild Pokémon has been dazed, stop resolving further actions
-            if battle.is_over or getattr(battle, "wild_dazed", False):
+            if battle.is_over or battle.wild_dazed:
                 break
 
             # Skip actions for battlers whose active Pokémon have fainted
-            battler = battle.trainer if action.battler_id == battle.trainer.battler_id else battle.opponent
+            battler = battle._battler_by_id[action.battler_id]
             active_pokemon = battler.get_active_pokemon()
             if not active_pokemon or all(p.current_hp <= 0 for p in active_pokemon):
                 # This side has no conscious active Pokémon right now (usually due to fainting earlier this turn)
@@ -690,8 +873,8 @@ class BattleEngine:
                 battle.turn_log.extend(result.get('messages', []))
 
         # End of turn effects (skip if wild Pokémon is in the special 'dazed' state)
-        if getattr(battle, "wild_dazed", False):
-            eot_messages = []
+        if battle.wild_dazed:
+            eot_messages = _EMPTY
             auto_switch_messages = []
         else:
             eot_messages = self._process_end_of_turn(battle)
@@ -722,153 +905,197 @@ class BattleEngine:
     
     def _sort_actions(self, battle: BattleState, actions: List[BattleAction]) -> List[BattleAction]:
         """Sort actions by priority, then speed"""
+        battler_by_id = battle._battler_by_id
+        speed_cache: Dict[int, int] = {}  # id(pokemon) -> effective speed for this sort
+
         # Get move priority and speed for each action
         def get_action_priority(action: BattleAction) -> Tuple[int, int]:
+            action_type = action.action_type
+
             # Switching always goes first
-            if action.action_type == 'switch':
+            if action_type == 'switch':
                 return (100, 999)
             
             # Items are high priority
-            if action.action_type == 'item':
+            if action_type == 'item':
                 return (90, 999)
             
             # Moves
-            if action.action_type == 'move':
-                move_data = self.moves_db.get_move(action.move_id)
-                priority = move_data.get('priority', 0)
+            if action_type == 'move':
+                priority = self._move(action.move_id).get('priority', 0)
                 
                 # Get Pokemon speed
-                battler = battle.trainer if action.battler_id == battle.trainer.battler_id else battle.opponent
-                pokemon = battler.get_active_pokemon()[0]  # Simplified for now
-                speed = self._get_effective_speed(pokemon)
+                pokemon = battler_by_id[action.battler_id].get_active_first()  # Simplified for now
+                key = id(pokemon)
+                speed = speed_cache.get(key)
+                if speed is None:
+                    speed = speed_cache[key] = self._get_effective_speed(pokemon)
                 
                 return (priority, speed)
             
             # Flee
             return (0, 0)
-        
-        actions.sort(key=get_action_priority, reverse=True)
-        return actions
+
+        if len(actions) < 2:
+            return actions
+
+        rng = battle._rng
+
+        # Singles: two actions, one comparison
+        if len(actions) == 2:
+            first, second = actions
+            k0 = get_action_priority(first)
+            k1 = get_action_priority(second)
+            first.priority, first.speed = k0
+            second.priority, second.speed = k1
+            if k1 > k0:
+                return [second, first]
+            ordered = [first, second]
+            if k1 == k0:
+                _shuffle_tied(rng, ordered)
+            return ordered
+
+        keyed = [(get_action_priority(a), a) for a in actions]
+        keyed.sort(key=itemgetter(0), reverse=True)
+        ordered = []
+        for (priority, speed), action in keyed:
+            action.priority = priority
+            action.speed = speed
+            ordered.append(action)
+
+        # Same tie rule as the singles path, applied to each run of equal priority+speed
+        start = 0
+        while start < len(keyed):
+            end = start + 1
+            while end < len(keyed) and keyed[end][0] == keyed[start][0]:
+                end += 1
+            if end - start > 1:
+                tied = ordered[start:end]
+                _shuffle_tied(rng, tied)
+                ordered[start:end] = tied
+            start = end
+        return ordered
+
+    def _move(self, move_id: str) -> Optional[Dict]:
+        """Memoized moves_db.get_move for the per-turn hot paths."""
+        cache = self._move_cache
+        move = cache.get(move_id)
+        if move is None:
+            move = cache[move_id] = self.moves_db.get_move(move_id)
+        return move
+
+    @staticmethod
+    def _basic_damage(attacker, defender, move_id: str, weather=None, terrain=None, battle_state=None) -> Tuple[int, bool, float, List[str]]:
+        """Flat damage fallback used in place of the enhanced calculator when it failed to import"""
+        return 10, False, 1.0, []
 
     def _get_effective_speed(self, pokemon) -> int:
-        speed = getattr(pokemon, 'speed', 0)
-        if ENHANCED_SYSTEMS_AVAILABLE and hasattr(self, 'calculator'):
+        speed = pokemon.speed
+        if self.calculator is not None:
             try:
                 speed = self.calculator.get_speed(pokemon)
             except Exception:
                 pass
-        if self.held_item_manager:
+        if self.held_item_manager and pokemon.held_item in self.held_item_manager._speed_items:
             speed = int(round(speed * self.held_item_manager.get_speed_multiplier(pokemon)))
         return speed
     
     async def _execute_action(self, battle: BattleState, action: BattleAction) -> Dict:
         """Execute a single action"""
-        if action.action_type == 'move':
-            return await self._execute_move(battle, action)
-        elif action.action_type == 'switch':
-            return self._execute_switch(battle, action)
-        elif action.action_type == 'item':
-            return self._execute_item(battle, action)
-        elif action.action_type == 'flee':
-            return self._execute_flee(battle, action)
-        
-        return {"messages": []}
+        handler = self._action_dispatch.get(action.action_type)
+        if not handler:
+            return {"messages": []}
+        result = handler(battle, action)
+        return await result if inspect.iscoroutine(result) else result
     
     async def _execute_move(self, battle: BattleState, action: BattleAction) -> Dict:
         """Execute a move action"""
         # Get attacker and defender
-        if action.battler_id == battle.trainer.battler_id:
-            attacker_battler = battle.trainer
-            defender_battler = battle.opponent
-        else:
-            attacker_battler = battle.opponent
-            defender_battler = battle.trainer
+        attacker_battler = battle._battler_by_id[action.battler_id]
+        defender_battler = battle._opposite[action.battler_id]
         
-        attacker = attacker_battler.get_active_pokemon()[0]
+        attacker = attacker_battler.get_active_first()
         defender = defender_battler.get_active_pokemon()[action.target_position or 0]
         
         # Check if attacker can move (status conditions, flinch, etc.)
-        if ENHANCED_SYSTEMS_AVAILABLE and hasattr(attacker, 'status_manager'):
+        # status_manager is only ever attached by the enhanced systems
+        if attacker.status_manager is not None:
             can_move, prevention_msg = attacker.status_manager.can_move(attacker)
             if not can_move:
                 return {"messages": [prevention_msg]}
         
         # Get move data
-        move_data = self.moves_db.get_move(action.move_id)
+        move_data = self._move(action.move_id)
         if not move_data:
             return {"messages": [f"{attacker.species_name} tried to use an unknown move!"]}
 
-        if self.held_item_manager:
-            restriction = self.held_item_manager.check_move_restrictions(attacker, move_data)
+        # Skip every held item hook outright when neither side holds anything (most wild battles)
+        items = self.held_item_manager
+        if items is not None and not (attacker.held_item or defender.held_item):
+            items = None
+
+        if items is not None and attacker.held_item in items._restricts_moves:
+            restriction = items.check_move_restrictions(attacker, move_data)
             if restriction:
                 return {"messages": [restriction]}
         
         # Validate move by ruleset
-        if hasattr(battle, 'ruleset') and self.ruleset_handler:
+        if self.ruleset_handler:
             ok, reason = self.ruleset_handler.is_move_allowed(action.move_id, battle.ruleset)
             if not ok:
                 return {"messages": [f"{attacker.species_name} tried to use {move_data.get('name', action.move_id)} but it's banned by rules ({reason})."]}
 
         # Deduct PP
-        for move in attacker.moves:
-            if move['move_id'] == action.move_id:
-                move['pp'] = max(0, move['pp'] - 1)
-                break
+        move_slot = attacker.get_move_slot(action.move_id)
+        if move_slot is not None and move_slot['pp'] > 0:
+            move_slot['pp'] -= 1
         
         # Calculate damage and apply effects
-        if ENHANCED_SYSTEMS_AVAILABLE:
-            damage, is_crit, effectiveness, effect_msgs = self.calculator.calculate_damage_with_effects(
-                attacker, defender, action.move_id,
-                weather=battle.weather,
-                terrain=battle.terrain,
-                battle_state=battle
-            )
-        else:
-            # Basic damage calculation fallback
-            damage = 10  # Simplified
-            is_crit = False
-            effectiveness = 1.0
-            effect_msgs = []
+        damage, is_crit, effectiveness, effect_msgs = self._calculate_damage(
+            attacker, defender, action.move_id,
+            weather=battle.weather,
+            terrain=battle.terrain,
+            battle_state=battle
+        )
 
-        if self.held_item_manager:
-            damage, held_msgs = self.held_item_manager.modify_damage(attacker, defender, move_data, damage)
-            effect_msgs.extend(held_msgs)
+        if items is not None:
+            damage, held_msgs = items.modify_damage(attacker, defender, move_data, damage, battle._rng)
+            if held_msgs:
+                effect_msgs.extend(held_msgs)
 
         # Endure check: if this hit would KO and defender is under ENDURE, leave at 1 HP
-        if damage >= defender.current_hp and hasattr(defender, 'status_manager') and 'endure' in getattr(defender.status_manager, 'volatile_statuses', {}):
-            if defender.current_hp > 1:
-                damage = defender.current_hp - 1
+        defender_hp = defender.current_hp
+        if damage >= defender_hp > 1:
+            defender_status = defender.status_manager
+            if defender_status is not None and 'endure' in defender_status.volatile_statuses:
+                damage = defender_hp - 1
                 effect_msgs.append(f"{defender.species_name} endured the hit!")
-# Apply damage
+        # Apply damage
         if damage > 0:
             defender.current_hp = max(0, defender.current_hp - damage)
         
         # Build message
-        messages = []
-        crit_text = " It's a critical hit!" if is_crit else ""
-        effectiveness_text = ""
-        if effectiveness > 1:
-            effectiveness_text = " It's super effective!"
-        elif effectiveness < 1 and effectiveness > 0:
-            effectiveness_text = " It's not very effective..."
-        elif effectiveness == 0:
-            effectiveness_text = " It doesn't affect the target..."
-        
-        move_msg = f"{attacker.species_name} used {move_data['name']}!"
         if damage > 0:
-            move_msg += f" ({damage} damage){crit_text}{effectiveness_text}"
-        messages.append(move_msg)
+            if effectiveness > 1:
+                effectiveness_text = _SUPER
+            elif effectiveness < 1:
+                effectiveness_text = _NVE if effectiveness > 0 else _NOEFF
+            else:
+                effectiveness_text = ""
+            move_msg = (f"{attacker.species_name} used {move_data['name']}! "
+                        f"({damage} damage){_CRIT if is_crit else ''}{effectiveness_text}")
+        else:
+            move_msg = f"{attacker.species_name} used {move_data['name']}!"
+        messages = [move_msg]
         messages.extend(effect_msgs)
 
-        if self.held_item_manager:
-            post_msgs = self.held_item_manager.apply_after_damage(attacker, move_data, damage)
-            messages.extend(post_msgs)
+        if items is not None:
+            post_msgs = items.apply_after_damage(attacker, move_data, damage)
+            if post_msgs:
+                messages.extend(post_msgs)
         
         # Check for faint / dazed state
         if defender.current_hp <= 0:
-            # Determine which battler owns the defender
-            defender_battler = battle.trainer if defender in battle.trainer.party else battle.opponent
-
             # Special handling for wild battles: wild Pokémon do not fully faint, they become "dazed"
             if battle.battle_type == BattleType.WILD and defender_battler == battle.opponent:
                 # Set HP to 1 and mark dazed instead of true faint
@@ -882,14 +1109,9 @@ class BattleEngine:
                 # For player's Pokemon fainting (non‑AI), they need to switch (if they have Pokemon left)
                 if defender_battler == battle.trainer and not defender_battler.is_ai:
                     if defender_battler.has_usable_pokemon():
-                        # Count usable Pokemon (excluding the fainted one)
-                        usable_count = sum(1 for p in defender_battler.party if p.current_hp > 0 and p != defender)
-                        if usable_count > 0:
-                            messages.append("You must send out another Pokémon!")
-                            battle.phase = 'FORCED_SWITCH'
-                            battle.forced_switch_battler_id = defender_battler.battler_id
-                        else:
-                            self._check_battle_end(battle)
+                        messages.append("You must send out another Pokémon!")
+                        battle.phase = 'FORCED_SWITCH'
+                        battle.forced_switch_battler_id = defender_battler.battler_id
 
                 # For AI-controlled trainers (NPCs), auto-send the next Pokémon before continuing
                 elif defender_battler.is_ai and battle.battle_type in (BattleType.TRAINER, BattleType.PVP):
@@ -899,7 +1121,7 @@ class BattleEngine:
                         for idx, p in enumerate(defender_battler.party):
                             if p is defender:
                                 continue
-                            if getattr(p, 'current_hp', 0) > 0:
+                            if p.current_hp > 0:
                                 replacement_index = idx
                                 break
                         if replacement_index is not None:
@@ -928,7 +1150,7 @@ class BattleEngine:
             for i, p in enumerate(battler.party):
                 if i == current_idx: 
                     continue
-                if getattr(p, 'current_hp', 0) > 0:
+                if p.current_hp > 0:
                     idx = i
                     break
         if idx is None:
@@ -949,21 +1171,24 @@ class BattleEngine:
         if not hazards:
             return messages
 
-        # Helper: get types and simple grounded/ability
-        types = [t.lower() for t in getattr(getattr(pokemon, 'species_data', {}), 'get', lambda *_: [])('types', [])] if False else [t.lower() for t in (getattr(pokemon, 'species_data', {}) or {}).get('types', [])]
-        ability_name = getattr(pokemon, 'ability', None) or getattr(pokemon, 'ability_name', None)
-        has_type = lambda t: t in types
-        is_grounded = (not has_type('flying')) and (str(ability_name).lower() != 'levitate')
+        # Types and simple grounded check (Flying type or Levitate -> not grounded)
+        bits = pokemon.type_bits
+        is_grounded = not bits & _FLYING and not pokemon.ability_flags & ABILITY_LEVITATE
+        max_hp = pokemon.max_hp
 
         # --- Stealth Rock ---
-        if 'stealth_rock' in hazards and hasattr(pokemon, 'species_data'):
-            chart = self.type_chart.chart if hasattr(self.type_chart, 'chart') else self.type_chart
-            eff = 1.0
-            if chart and 'rock' in chart:
-                for t in types:
-                    if t in chart['rock']:
-                        eff *= chart['rock'][t]
-            base = max(1, pokemon.max_hp // 8)
+        if 'stealth_rock' in hazards:
+            rock_cache = getattr(self.type_chart, '_rock_mult_cache', None)
+            eff = rock_cache.get(bits) if rock_cache is not None else None
+            if eff is None:
+                chart = self._chart
+                eff = 1.0
+                if chart and 'rock' in chart:
+                    for t in pokemon.species_data.get('types', ()):
+                        t = t.lower()
+                        if t in chart['rock']:
+                            eff *= chart['rock'][t]
+            base = max(1, max_hp // 8)
             dmg = max(1, int(base * eff)) if eff > 0 else 0
             if dmg > 0:
                 pokemon.current_hp = max(0, pokemon.current_hp - dmg)
@@ -971,23 +1196,17 @@ class BattleEngine:
 
         # --- Spikes (grounded only) ---
         if is_grounded and 'spikes' in hazards:
-            layers = min(3, int(hazards.get('spikes', 1)))
-            # 1 layer: 1/8, 2: 1/6, 3: 1/4
-            if layers == 1:
-                frac_num, frac_den = 1, 8
-            elif layers == 2:
-                frac_num, frac_den = 1, 6
-            else:
-                frac_num, frac_den = 1, 4
-            dmg = max(1, (pokemon.max_hp * frac_num) // frac_den)
+            layers = max(1, min(3, int(hazards.get('spikes', 1))))
+            frac_num, frac_den = _SPIKES_FRAC[layers]
+            dmg = max(1, (max_hp * frac_num) // frac_den)
             pokemon.current_hp = max(0, pokemon.current_hp - dmg)
             messages.append(f"{pokemon.species_name} is hurt by Spikes! (-{dmg} HP)")
 
         # --- Toxic Spikes (grounded only) ---
         if 'toxic_spikes' in hazards and is_grounded:
-            layers = min(2, int(hazards.get('toxic_spikes', 1)))
+            layers = max(1, min(2, int(hazards.get('toxic_spikes', 1))))
             # Poison-type absorbs the spikes (if grounded)
-            if has_type('poison'):
+            if bits & _POISON:
                 # Clear all layers from this side
                 if battler == battle.opponent:
                     battle.opponent_hazards.pop('toxic_spikes', None)
@@ -996,10 +1215,10 @@ class BattleEngine:
                 messages.append(f"{pokemon.species_name} absorbed the Toxic Spikes!")
             else:
                 # Steel-type and Poison-type can't be poisoned; Flying/Levitate handled by grounded
-                if not has_type('steel'):
+                if not bits & _STEEL:
                     # Apply major status via status_manager if available
-                    if hasattr(pokemon, 'status_manager'):
-                        status = 'tox' if layers >= 2 else 'psn'
+                    if pokemon.status_manager is not None:
+                        status = _TSPIKES_STATUS[layers]
                         can_apply, _ = pokemon.status_manager.can_apply_status(status)
                         if can_apply:
                             success, msg = pokemon.status_manager.apply_status(status)
@@ -1008,48 +1227,25 @@ class BattleEngine:
 
         # --- Sticky Web (grounded only): lower Speed by 1 stage ---
         if 'sticky_web' in hazards and is_grounded:
-            if not hasattr(pokemon, 'stat_stages'):
-                pokemon.stat_stages = {
-                    'attack': 0, 'defense': 0, 'sp_attack': 0,
-                    'sp_defense': 0, 'speed': 0, 'evasion': 0, 'accuracy': 0
-                }
             pokemon.stat_stages['speed'] = max(-6, pokemon.stat_stages['speed'] - 1)
             messages.append(f"{pokemon.species_name}'s Speed fell! (-1)")
 
         return messages
 
-        # Stealth Rock
-        if 'stealth_rock' in hazards and hasattr(pokemon, 'species_data'):
-            defender_types = [t.lower() for t in pokemon.species_data.get('types', [])]
-            # Build chart
-            chart = self.type_chart.chart if hasattr(self.type_chart, 'chart') else self.type_chart
-            # Effectiveness of Rock vs defender types
-            eff = 1.0
-            if chart and 'rock' in chart:
-                for t in defender_types:
-                    if t in chart['rock']:
-                        eff *= chart['rock'][t]
-            base = max(1, pokemon.max_hp // 8)
-            dmg = int(base * eff)
-            if eff > 0 and dmg < 1:
-                dmg = 1
-            if dmg > 0:
-                pokemon.current_hp = max(0, pokemon.current_hp - dmg)
-                messages.append(f"{pokemon.species_name} is hurt by Stealth Rock! (-{dmg} HP)")
-        return messages
     def _execute_switch(self, battle: BattleState, action: BattleAction, forced: bool = False) -> Dict:
         """Execute a Pokemon switch"""
-        battler = battle.trainer if action.battler_id == battle.trainer.battler_id else battle.opponent
+        battler = battle._battler_by_id[action.battler_id]
 
         # Get old and new Pokemon
         old_pokemon = battler.get_active_pokemon()[0]
         new_pokemon = battler.party[action.switch_to_position]
 
         # Switch
-        battler.active_positions[0] = action.switch_to_position
+        battler.set_active(0, action.switch_to_position)
 
         if self.held_item_manager:
             self.held_item_manager.clear_choice_lock(old_pokemon)
+            self.held_item_manager.invalidate(new_pokemon)
 
         # Trigger entry abilities
         messages = []
@@ -1084,7 +1280,7 @@ class BattleEngine:
         if switch_to_position < 0 or switch_to_position >= len(battler.party):
             return {"error": "Invalid party slot"}
         target = battler.party[switch_to_position]
-        if getattr(target, 'current_hp', 0) <= 0:
+        if target.current_hp <= 0:
             return {"error": "That Pokémon can't battle"}
 
         action = BattleAction(action_type='switch', battler_id=battler_id, switch_to_position=switch_to_position)
@@ -1093,7 +1289,7 @@ class BattleEngine:
         battle.phase = 'WAITING_ACTIONS'
         battle.forced_switch_battler_id = None
         battle.pending_ai_switch_index = None
-        battle.pending_actions.pop(str(battler_id), None)
+        battle.pending_actions.pop(battler_id, None)
 
         return result
     
@@ -1108,7 +1304,7 @@ class BattleEngine:
             return {"messages": ["Can't flee from a trainer battle!"]}
         
         # Simple flee chance for now
-        if random.random() < 0.5:
+        if battle._rng.random() < 0.5:
             battle.is_over = True
             battle.fled = True
             battle.winner = None
@@ -1116,42 +1312,52 @@ class BattleEngine:
         else:
             return {"messages": ["Can't escape!"]}
     
-    def _process_end_of_turn(self, battle: BattleState) -> List[str]:
+    def _process_end_of_turn(self, battle: BattleState) -> Sequence[str]:
         """Process end-of-turn effects"""
-        messages = []
-        
         if not ENHANCED_SYSTEMS_AVAILABLE:
-            return []
-        
-        # Status damage
-        for pokemon in battle.trainer.get_active_pokemon() + battle.opponent.get_active_pokemon():
-            if hasattr(pokemon, 'status_manager'):
-                status_msgs = pokemon.status_manager.apply_end_of_turn_effects(pokemon)
-                messages.extend(status_msgs)
-            if self.held_item_manager:
-                messages.extend(self.held_item_manager.process_end_of_turn(pokemon))
-        
-        # Weather effects
-        if battle.weather:
-            for pokemon in battle.trainer.get_active_pokemon():
-                weather_msg = self.ability_handler.apply_weather_damage(pokemon, battle.weather)
-                if weather_msg:
-                    messages.append(weather_msg)
-                
-                heal_msg = self.ability_handler.apply_weather_healing(pokemon, battle.weather)
-                if heal_msg:
-                    messages.append(heal_msg)
-            
-            for pokemon in battle.opponent.get_active_pokemon():
-                weather_msg = self.ability_handler.apply_weather_damage(pokemon, battle.weather)
+            return _EMPTY
+
+        messages = []
+
+        # Every phase runs over the same speed-ordered list (fastest first); speeds
+        # don't change during end of turn, so they are computed once here
+        active = sorted(
+            battle.trainer.get_active_pokemon() + battle.opponent.get_active_pokemon(),
+            key=self._get_effective_speed,
+            reverse=True,
+        )
+
+        # Phase 1: weather damage / healing
+        weather = battle.weather
+        if weather:
+            weather_damage = self.ability_handler.apply_weather_damage
+            weather_healing = self.ability_handler.apply_weather_healing
+            for pokemon in active:
+                weather_msg = weather_damage(pokemon, weather)
                 if weather_msg:
                     messages.append(weather_msg)
-                
-                heal_msg = self.ability_handler.apply_weather_healing(pokemon, battle.weather)
+
+                heal_msg = weather_healing(pokemon, weather)
                 if heal_msg:
                     messages.append(heal_msg)
-            
-            # Decrement weather
+
+        # Phase 2: held items (Leftovers)
+        if self.held_item_manager:
+            item_end_of_turn = self.held_item_manager.process_end_of_turn
+            for pokemon in active:
+                item_msgs = item_end_of_turn(pokemon)
+                if item_msgs:
+                    messages.extend(item_msgs)
+
+        # Phase 3: status damage (poison, burn, leech seed...)
+        for pokemon in active:
+            if pokemon.status_manager is not None:
+                status_msgs = pokemon.status_manager.apply_end_of_turn_effects(pokemon)
+                if status_msgs:
+                    messages.extend(status_msgs)
+
+        # Decrement weather
+        if weather:
             battle.weather_turns -= 1
             if battle.weather_turns <= 0:
                 messages.append(f"The {battle.weather} subsided!")
@@ -1206,8 +1412,40 @@ class BattleEngine:
 
 class CommandParser:
     """Parse natural language battle commands into BattleActions"""
+    _SWITCH_RE = re.compile(r'switch|swap|go ')
+
     def __init__(self, moves_db):
         self.moves_db = moves_db
+        # tuple of move ids -> (pattern with one group per move, move id per group) for that moveset
+        self._matchers: Dict[Tuple[str, ...], Optional[Tuple[Any, Tuple[str, ...]]]] = {}
+
+    def _move_matcher(self, move_ids: Tuple[str, ...]) -> Optional[Tuple[Any, Tuple[str, ...]]]:
+        try:
+            return self._matchers[move_ids]
+        except KeyError:
+            pass
+        groups = []
+        ids = []
+        for mid in move_ids:
+            md = self.moves_db.get_move(mid) if mid else None
+            if not md:
+                continue
+            move_id = md.get('id') or mid
+            names = [n for n in dict.fromkeys(((md.get('name') or md.get('id') or '').lower(), move_id)) if n]
+            if not names:
+                continue
+            groups.append('(' + '|'.join(map(re.escape, names)) + ')')
+            ids.append(move_id)
+        matcher = (re.compile('|'.join(groups)), tuple(ids)) if groups else None
+        self._matchers[move_ids] = matcher
+        return matcher
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _resolve(command: str, matcher: Tuple[Any, Tuple[str, ...]]) -> Optional[str]:
+        pattern, ids = matcher
+        m = pattern.search(command)
+        return ids[m.lastindex - 1] if m else None
 
     def parse(self, command: str, active_pokemon: Any, battler_id: int) -> Optional[BattleAction]:
         """Parse a simple command into a BattleAction.
@@ -1221,22 +1459,18 @@ class CommandParser:
         command = command.lower().strip()
 
         # Switch intent: handled by UI elsewhere
-        if any(w in command for w in ('switch', 'swap', 'go ')):
+        if self._SWITCH_RE.search(command):
             return None
 
         # Try to match one of the user's moves
-        for mv in getattr(active_pokemon, 'moves', []):
-            md = self.moves_db.get_move(mv.get('move_id'))
-            if not md:
-                continue
-            move_name = (md.get('name') or md.get('id') or '').lower()
-            move_id = md.get('id') or mv.get('move_id')
-            if (move_name and move_name in command) or (move_id and move_id in command):
-                return BattleAction(
-                    action_type='move',
-                    battler_id=battler_id,
-                    move_id=move_id,
-                    target_position=0
-                )
-
-        return None
\ No newline at end of file
+        move_ids = tuple(mv.get('move_id') for mv in getattr(active_pokemon, 'moves', []))
+        matcher = self._move_matcher(move_ids)
+        move_id = self._resolve(command, matcher) if matcher else None
+        if move_id is None:
+            return None
+        return BattleAction(
+            action_type='move',
+            battler_id=battler_id,
+            move_id=move_id,
+            target_position=0
+        )
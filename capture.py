@@ -18,6 +18,7 @@ Notes:
 """
 
 from typing import Optional, Dict
+from functools import lru_cache
 import math
 import random
 
@@ -56,6 +57,7 @@ def modified_catch_rate(max_hp: int, cur_hp: int, species_catch_rate: int, ball_
     return max(1, a)
 
 
+@lru_cache(maxsize=256)
 def shake_threshold(a: int) -> int:
     """
     Gen VI+ shake check threshold:
@@ -89,7 +91,7 @@ def simulate_throw(
         species_catch_rate: Species catch rate from pokedex data
         ball_bonus: Ball-specific multiplier
         status: Optional status string (sleep, paralyze, etc.)
-        rng: Optional random.Random instance for determinism
+        rng: Optional random.Random instance for determinism (module-level random otherwise)
 
     Returns:
         {
@@ -99,7 +101,7 @@ def simulate_throw(
             "b": int,
         }
     """
-    r = rng or random.Random()
+    r = rng or random
     status_key = (status or "healthy").lower()
     status_bonus = StatusBonus.get(status_key, 1.0)
 
@@ -1,12 +1,18 @@
+import asyncio
+import time
+from collections import deque
+from functools import lru_cache
+
 import discord
 from discord.ext import commands
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Optional
 
 from battle_engine_v2 import BattleEngine, BattleType, BattleAction, BattleFormat, HeldItemManager
 from battle_exp_integration import BattleExpHandler
 from capture import simulate_throw, guaranteed_capture
-from learnset_database import LearnsetDatabase
+from database import PlayerDatabase
+from learnset_database import load_learnsets
 # Emoji placeholders (fallbacks if ui.emoji is missing)
 try:
     from ui.emoji import SWORD, FIELD, EVENTS, YOU, FOE
@@ -18,15 +24,109 @@ try:
 except Exception:
     BUILD_TAG = "dev"
 
+try:
+    from ui.buttons import ReturnToEncounterView
+except Exception:
+    ReturnToEncounterView = None
+
+# How long a user's Poké Ball list is reused between Bag opens / throws
+BALL_CACHE_TTL = 5.0
+
+# Sweep user_battles for stale entries once every this many unregistered battles
+USER_BATTLE_SWEEP_EVERY = 100
+
+# Battle text quotes player-chosen names; never let it ping anyone
+_NO_MENTIONS = discord.AllowedMentions.none()
+
+# Discord's per-channel message limit: this many messages every CHANNEL_SEND_WINDOW seconds
+CHANNEL_SEND_LIMIT = 5
+CHANNEL_SEND_WINDOW = 5.0
+
+# Discord caps a message at 10 embeds and 6000 characters across them
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+
+# Give up on a turn before the interaction's 15 minute followup window closes
+TURN_RESOLVE_TIMEOUT = 14 * 60
+TURN_TIMEOUT_TEXT = "⌛ The turn took too long to resolve. Please try again."
+
+# Every possible 10-segment HP bar, indexed by filled segments
+_HP_BARS = tuple(("🟩" * filled) + ("⬜" * (10 - filled)) for filled in range(11))
+
+
+@lru_cache(maxsize=256)
+def _field_effects_text(weather: Optional[str], weather_turns: int, terrain: Optional[str], terrain_turns: int) -> str:
+    """Battle panel 'Field Effects' text; weather/terrain rarely change between turns, so reuse it"""
+    lines = []
+    if weather:
+        turns_text = f" ({weather_turns} turns left)" if weather_turns > 0 else ""
+        lines.append(f"Weather: **{weather.title()}**{turns_text}")
+    if terrain:
+        turns_text = f" ({terrain_turns} turns left)" if terrain_turns > 0 else ""
+        lines.append(f"Terrain: **{terrain.title()}**{turns_text}")
+    return "\n".join(lines)
+
+
+@lru_cache(maxsize=256)
+def _party_option_fields(party_state: tuple) -> tuple:
+    """(label, description, value) per party slot for a party of (name, current_hp, max_hp) entries"""
+    return tuple(
+        (name, f"HP {current_hp}/{max_hp}", str(idx))
+        for idx, (name, current_hp, max_hp) in enumerate(party_state)
+    )
+
+
+class _ChannelSendLimiter:
+    """Sliding-window limiter that holds a channel's sends to CHANNEL_SEND_LIMIT per window"""
+    __slots__ = ('lock', 'sent_at')
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.sent_at: deque = deque()
+
+    async def wait_turn(self):
+        async with self.lock:
+            now = time.monotonic()
+            while self.sent_at and now - self.sent_at[0] >= CHANNEL_SEND_WINDOW:
+                self.sent_at.popleft()
+            if len(self.sent_at) >= CHANNEL_SEND_LIMIT:
+                await asyncio.sleep(self.sent_at[0] + CHANNEL_SEND_WINDOW - now)
+                self.sent_at.popleft()
+                now = time.monotonic()
+            self.sent_at.append(now)
+
+    def is_idle(self, now: float) -> bool:
+        """True once nothing is waiting and the last send has left the window"""
+        return not self.lock.locked() and (not self.sent_at or now - self.sent_at[-1] >= CHANNEL_SEND_WINDOW)
+
+
 class BattleCog(commands.Cog):
     """Handles battle UI and flow."""
+    # held item id -> display name ("choice_band" -> "Choice Band")
+    _ITEM_NAME_CACHE: dict[str, str] = {}
+
     def __init__(self, bot: commands.Bot, battle_engine: BattleEngine):
         self.bot = bot
         self.battle_engine = battle_engine
         # Tracks active battle per user id (int -> str battle_id)
         self.user_battles = {}
+        self._unregistered_since_sweep = 0
+        # discord user id -> (monotonic time built, {item_id: (item_data, quantity)})
+        self._ball_cache: dict[int, tuple[float, dict]] = {}
+        # item_id -> item data for every Poké Ball in items.json
+        self._ball_data = self._init_ball_index()
+        # channel id -> limiter pacing the public battle messages sent there
+        self._send_limiters: dict[int, _ChannelSendLimiter] = {}
+        # Shared with the PlayerManager when there is one; otherwise opened on first save
+        self._pdb: Optional[PlayerDatabase] = getattr(getattr(bot, "player_manager", None), "db", None)
         self.exp_handler = self._init_exp_handler()
 
+    def _init_ball_index(self) -> dict:
+        items_db = getattr(self.bot, "items_db", None)
+        if not items_db:
+            return {}
+        return items_db.get_item_index("pokeball")
+
     def _init_exp_handler(self) -> Optional[BattleExpHandler]:
         species_db = getattr(self.bot, "species_db", None)
         player_manager = getattr(self.bot, "player_manager", None)
@@ -37,7 +137,7 @@ class BattleCog(commands.Cog):
         learnset_path = Path("data/learnsets.json")
         if learnset_path.exists():
             try:
-                learnset_db = LearnsetDatabase(str(learnset_path))
+                learnset_db = load_learnsets(str(learnset_path))
             except Exception:
                 learnset_db = None
 
@@ -46,6 +146,31 @@ class BattleCog(commands.Cog):
         except Exception:
             return None
 
+    def _get_player_db(self) -> PlayerDatabase:
+        """Shared PlayerDatabase for saving battle results (the PlayerManager's when there is one)."""
+        if self._pdb is None:
+            self._pdb = PlayerDatabase('data/players.db')
+        return self._pdb
+
+    async def enqueue_send(self, interaction: discord.Interaction, *args, **kwargs):
+        """interaction.followup.send, paced to Discord's per-channel message limit.
+
+        Ephemeral messages never appear in the channel, so they skip the wait. 429s that still
+        happen are retried by discord.py itself using the response's Retry-After.
+        """
+        channel_id = getattr(interaction, 'channel_id', None)
+        if channel_id is not None and not kwargs.get('ephemeral'):
+            limiter = self._send_limiters.get(channel_id)
+            if limiter is None:
+                limiter = self._send_limiters[channel_id] = _ChannelSendLimiter()
+            await limiter.wait_turn()
+        return await interaction.followup.send(*args, **kwargs)
+
+    async def _followup(self, interaction: discord.Interaction, *args, **kwargs):
+        """Every battle followup goes through here: paced per channel, with mentions disabled."""
+        kwargs.setdefault('allowed_mentions', _NO_MENTIONS)
+        return await self.enqueue_send(interaction, *args, **kwargs)
+
     def _unregister_battle(self, battle):
         """Remove all user tracking entries for a finished battle."""
         if not battle:
@@ -54,73 +179,116 @@ class BattleCog(commands.Cog):
         if getattr(battle, 'battle_type', None) == BattleType.PVP:
             self.user_battles.pop(getattr(battle.opponent, 'battler_id', None), None)
 
+        self._unregistered_since_sweep += 1
+        if self._unregistered_since_sweep >= USER_BATTLE_SWEEP_EVERY:
+            self._prune_user_battles()
+
+    def _prune_user_battles(self):
+        """Drop user entries whose battle is gone or over but was never unregistered (errors, abandoned prompts),
+        and the send limiters of channels that have gone quiet."""
+        self._unregistered_since_sweep = 0
+        stale = []
+        for user_id, battle_id in self.user_battles.items():
+            battle = self.battle_engine.get_battle(battle_id)
+            if battle is None or battle.is_over:
+                stale.append(user_id)
+        for user_id in stale:
+            del self.user_battles[user_id]
+
+        # Channels with no recent battle messages don't need their limiter any more
+        now = time.monotonic()
+        idle = [channel_id for channel_id, limiter in self._send_limiters.items() if limiter.is_idle(now)]
+        for channel_id in idle:
+            del self._send_limiters[channel_id]
+
     def _get_ball_inventory(self, discord_user_id: int):
         """Return a dict of {item_id: (item_data, quantity)} for Poké Balls.
 
-        Uses ItemsDatabase (self.bot.items_db) and the player's inventory rows.
+        Uses the ball index built from ItemsDatabase at load and the player's ball inventory rows.
+        Results are reused for BALL_CACHE_TTL seconds; _consume_ball drops them.
         """
-        items_db = getattr(self.bot, "items_db", None)
-        if not items_db:
+        cached = self._ball_cache.get(discord_user_id)
+        if cached and time.monotonic() - cached[0] < BALL_CACHE_TTL:
+            return dict(cached[1])
+
+        ball_data = self._ball_data
+        if not ball_data:
             return {}
         pm = self.bot.player_manager
-        inventory_rows = pm.get_inventory(discord_user_id)
+        # Only ball rows come back from the database
+        inventory_rows = pm.get_inventory_items(discord_user_id, ball_data)
         balls = {}
         for row in inventory_rows:
             item_id = row.get("item_id")
             qty = row.get("quantity", 0)
-            if qty <= 0:
-                continue
-            # Look up item data via ItemsDatabase
-            item_data = items_db.get_item(item_id)
-            if not item_data:
-                continue
-            if item_data.get("category") == "pokeball":
-                balls[item_id] = (item_data, qty)
-        return balls
+            if item_id in ball_data and qty > 0:
+                balls[item_id] = (ball_data[item_id], qty)
+        self._ball_cache[discord_user_id] = (time.monotonic(), balls)
+        return dict(balls)
 
     def _consume_ball(self, discord_user_id: int, item_id: str) -> bool:
         """Remove one ball from inventory if possible."""
         pm = self.bot.player_manager
-        return pm.remove_item(discord_user_id, item_id, quantity=1)
+        removed = pm.remove_item(discord_user_id, item_id, quantity=1)
+        if removed:
+            self._ball_cache.pop(discord_user_id, None)
+        return removed
 
-    async def _send_dazed_prompt(self, interaction: discord.Interaction, battle):
-        """Send 'Will you catch it?' prompt when wild Pokémon is dazed."""
-        opponent_mon = battle.opponent.get_active_pokemon()[0]
+    def _build_dazed_prompt(self, battle) -> tuple[discord.Embed, 'DazedCatchView']:
+        opponent_mon = battle.opponent.get_active_first()
         embed = discord.Embed(
             title=f"😵 The wild {opponent_mon.species_name} is dazed!",
             description="**Will you catch it?**",
             color=discord.Color.gold()
         )
-
-        view = DazedCatchView(self, battle.battle_id)
-        await interaction.followup.send(embed=embed, view=view)
+        return embed, DazedCatchView(self, battle.battle_id, battle.trainer.battler_id)
+
+    async def _send_embeds(self, interaction: discord.Interaction, embeds: list[discord.Embed], view: Optional[discord.ui.View] = None):
+        """Send embeds in as few followup messages as Discord allows; the view goes on the last one."""
+        batches: list[list[discord.Embed]] = []
+        chars = 0
+        for embed in embeds:
+            size = len(embed)
+            if not batches or len(batches[-1]) >= MAX_EMBEDS_PER_MESSAGE or chars + size > MAX_EMBED_CHARS_PER_MESSAGE:
+                batches.append([])
+                chars = 0
+            batches[-1].append(embed)
+            chars += size
+
+        if not batches:
+            if view is not None:
+                await self._followup(interaction, view=view)
+            return
+        for batch in batches[:-1]:
+            await self._followup(interaction, embeds=batch)
+        if view is not None:
+            await self._followup(interaction, embeds=batches[-1], view=view)
+        else:
+            await self._followup(interaction, embeds=batches[-1])
 
     async def _handle_ball_throw(self, interaction: discord.Interaction, battle_id: str, item_id: str, guaranteed: bool = False):
         """Core capture logic used by the dazed 'Yes' flow, and for in-battle Bag throws."""
         battle = self.battle_engine.get_battle(battle_id)
 
-        async def send_msg(*args, **kwargs):
-            """Safe send helper: uses response.send_message first, then followups."""
-            if not interaction.response.is_done():
-                await interaction.response.send_message(*args, **kwargs)
-            else:
-                await interaction.followup.send(*args, **kwargs)
+        # Acknowledge once up front so every reply below is a plain followup
+        if not interaction.response.is_done():
+            await interaction.response.defer()
 
         if not battle or battle.battle_type != BattleType.WILD:
-            await send_msg("❌ You can only use Poké Balls in wild battles.", ephemeral=True)
+            await self._followup(interaction, "❌ You can only use Poké Balls in wild battles.", ephemeral=True)
             return
 
-        wild_mon = battle.opponent.get_active_pokemon()[0]
+        wild_mon = battle.opponent.get_active_first()
         balls = self._get_ball_inventory(interaction.user.id)
         if item_id not in balls:
-            await send_msg("❌ You don't have that kind of Poké Ball.", ephemeral=True)
+            await self._followup(interaction, "❌ You don't have that kind of Poké Ball.", ephemeral=True)
             return
 
         item_data, _qty = balls[item_id]
 
         # Consume the ball up front
         if not self._consume_ball(interaction.user.id, item_id):
-            await send_msg("❌ You don't have that Poké Ball anymore.", ephemeral=True)
+            await self._followup(interaction, "❌ You don't have that Poké Ball anymore.", ephemeral=True)
             return
 
         # Determine ball bonus: use item's catch_rate_modifier as base
@@ -166,7 +334,7 @@ class BattleCog(commands.Cog):
                 description=f"You used **{item_data.get('name', item_id)}**.\n{location_text}",
                 color=discord.Color.green()
             )
-            await send_msg(embed=embed)
+            await self._followup(interaction, embed=embed)
             await self.send_return_to_encounter_prompt(interaction, interaction.user.id)
             return
         else:
@@ -176,7 +344,7 @@ class BattleCog(commands.Cog):
                 description=msg,
                 color=discord.Color.orange()
             )
-            await send_msg(embed=embed)
+            await self._followup(interaction, embed=embed)
             # Note: throwing a ball consumes the turn externally; the turn resolution
             # for the wild Pokémon will still happen via the normal battle engine.
 
@@ -195,9 +363,7 @@ class BattleCog(commands.Cog):
         if not encounters or not location_id:
             return
 
-        try:
-            from ui.buttons import ReturnToEncounterView
-        except Exception:
+        if ReturnToEncounterView is None:
             return
 
         message = "↩️ Continue exploring the remaining encounters from your last roll."
@@ -211,7 +377,7 @@ class BattleCog(commands.Cog):
 
         try:
             if interaction.response.is_done():
-                await interaction.followup.send(**send_kwargs)
+                await self._followup(interaction, **send_kwargs)
             else:
                 await interaction.response.send_message(**send_kwargs)
         except Exception:
@@ -229,7 +395,7 @@ class BattleCog(commands.Cog):
             if not interaction.response.is_done():
                 await interaction.response.send_message("Battle not found!", ephemeral=True)
             else:
-                await interaction.followup.send("Battle not found!", ephemeral=True)
+                await self._followup(interaction, "Battle not found!", ephemeral=True)
             return
 
         # Make sure we can send multiple messages from a select interaction
@@ -239,8 +405,8 @@ class BattleCog(commands.Cog):
         except Exception:
             pass
 
-        trainer_mon = battle.trainer.get_active_pokemon()[0]
-        opponent_mon = battle.opponent.get_active_pokemon()[0]
+        trainer_mon = battle.trainer.get_active_first()
+        opponent_mon = battle.opponent.get_active_first()
 
         battle_mode = battle_type or battle.battle_type
 
@@ -261,48 +427,39 @@ class BattleCog(commands.Cog):
             color=discord.Color.blue()
         )
         enc.set_footer(text=f"Build: {BUILD_TAG}")
-        await interaction.followup.send(embed=enc)
 
         # 2) Send-out + entry effects
-        sendout_lines = []
-
-        if battle_mode == BattleType.WILD:
-            sendout_lines.append(
-                f"**{battle.trainer.battler_name}** sent out **{trainer_mon.species_name}**!"
-            )
-        else:
-            sendout_lines.append(
-                f"**{battle.trainer.battler_name}** sent out **{trainer_mon.species_name}**!"
-            )
-            sendout_lines.append(
-                f"**{battle.opponent.battler_name}** sent out **{opponent_mon.species_name}**!"
-            )
-
-        for msg in (getattr(battle, "entry_messages", []) or []):
-            sendout_lines.append(f"• {msg}")
+        sendout_desc = f"**{battle.trainer.battler_name}** sent out **{trainer_mon.species_name}**!"
+        if battle_mode != BattleType.WILD:
+            sendout_desc += f"\n**{battle.opponent.battler_name}** sent out **{opponent_mon.species_name}**!"
+        if battle.entry_messages:
+            sendout_desc += "".join(f"\n• {msg}" for msg in battle.entry_messages)
 
         send_embed = discord.Embed(
             title="Send-out",
-            description="\n".join(sendout_lines),
+            description=sendout_desc,
             color=discord.Color.blurple()
         )
 
         fields = []
-        if getattr(battle, "weather", None):
-            wt = getattr(battle, "weather_turns", None)
-            fields.append(f"Weather: **{battle.weather.title()}**" + (f" ({wt} turns)" if wt else ""))
-        if getattr(battle, "terrain", None):
-            tt = getattr(battle, "terrain_turns", None)
-            fields.append(f"Terrain: **{battle.terrain.title()}**" + (f" ({tt} turns)" if tt else ""))
+        weather = battle.weather
+        terrain = battle.terrain
+        if weather:
+            wt = battle.weather_turns
+            fields.append(f"Weather: **{weather.title()}**" + (f" ({wt} turns)" if wt else ""))
+        if terrain:
+            tt = battle.terrain_turns
+            fields.append(f"Terrain: **{terrain.title()}**" + (f" ({tt} turns)" if tt else ""))
         if fields:
             send_embed.add_field(name=f"{FIELD} Field Effects", value="\n".join(fields), inline=False)
 
-        await interaction.followup.send(embed=send_embed)
+        # Opening and send-out share one message; the panel below carries the view
+        await self._followup(interaction, embeds=[enc, send_embed])
 
         # 3) Main action embed + view
         main_embed = self._create_battle_embed(battle)
         view = self._create_battle_view(battle)
-        await interaction.followup.send(embed=main_embed, view=view)
+        await self._followup(interaction, embed=main_embed, view=view)
 
     # --------------------
     # Helpers
@@ -312,18 +469,21 @@ class BattleCog(commands.Cog):
             filled = int(round(10 * max(0, mon.current_hp) / max(1, mon.max_hp)))
         except Exception:
             filled = 0
-        return ("🟩" * filled) + ("⬜" * (10 - filled))
+        return _HP_BARS[min(10, filled)]
 
     def _held_item_text(self, mon) -> Optional[str]:
         item_id = getattr(mon, 'held_item', None)
         if not item_id:
             return None
-        return item_id.replace('_', ' ').title()
+        pretty = self._ITEM_NAME_CACHE.get(item_id)
+        if pretty is None:
+            pretty = self._ITEM_NAME_CACHE[item_id] = item_id.replace('_', ' ').title()
+        return pretty
 
     def _create_battle_embed(self, battle) -> discord.Embed:
         # Minimal, safe fallback embed; keep your richer implementation if present in your project
-        trainer_pokemon = battle.trainer.get_active_pokemon()[0]
-        opponent_pokemon = battle.opponent.get_active_pokemon()[0]
+        trainer_pokemon = battle.trainer.get_active_first()
+        opponent_pokemon = battle.opponent.get_active_first()
 
         e = discord.Embed(
             title=f"{SWORD} Battle",
@@ -349,19 +509,17 @@ class BattleCog(commands.Cog):
             value=opponent_value,
             inline=False
         )
-        if getattr(battle, "recent_events", None):
-            e.add_field(name=f"{EVENTS} Recent Events", value="\n".join(battle.recent_events[-5:]), inline=False)
-        if getattr(battle, "weather", None) or getattr(battle, "terrain", None):
-            lines = []
-            if getattr(battle, "weather", None):
-                weather_turns = getattr(battle, "weather_turns", 0)
-                turns_text = f" ({weather_turns} turns left)" if weather_turns > 0 else ""
-                lines.append(f"Weather: **{battle.weather.title()}**{turns_text}")
-            if getattr(battle, "terrain", None):
-                terrain_turns = getattr(battle, "terrain_turns", 0)
-                turns_text = f" ({terrain_turns} turns left)" if terrain_turns > 0 else ""
-                lines.append(f"Terrain: **{battle.terrain.title()}**{turns_text}")
-            e.add_field(name=f"{FIELD} Field Effects", value="\n".join(lines), inline=False)
+        recent_events = getattr(battle, "recent_events", None)
+        if recent_events:
+            e.add_field(name=f"{EVENTS} Recent Events", value="\n".join(recent_events[-5:]), inline=False)
+        weather = battle.weather
+        terrain = battle.terrain
+        if weather or terrain:
+            e.add_field(
+                name=f"{FIELD} Field Effects",
+                value=_field_effects_text(weather, battle.weather_turns, terrain, battle.terrain_turns),
+                inline=False
+            )
         e.set_footer(text=f"Build: {BUILD_TAG}")
         return e
 
@@ -369,42 +527,35 @@ class BattleCog(commands.Cog):
         return BattleActionView(battle.battle_id, battle.trainer.battler_id, self.battle_engine, battle, self)
 
     def _build_turn_embed(self, messages: list[str]) -> discord.Embed:
-        if messages:
-            spaced = []
-            for msg in messages[-6:]:
-                spaced.append(msg)
-                spaced.append("")
-            if spaced and spaced[-1] == "":
-                spaced.pop()
-            desc = "\n".join(spaced)
-        else:
-            desc = "The turn resolves."
+        # Last six messages, separated by a blank line
+        desc = "\n\n".join(messages[-6:]) if messages else "The turn resolves."
         return discord.Embed(title="Turn Result", description=desc, color=discord.Color.orange())
 
-    def _build_switch_embed(self, messages: list[str], title: str = "Switch", color: Optional[discord.Color] = None):
-        if not messages:
+    def _build_switch_embed(self, messages: Iterable[str], title: str = "Switch", color: Optional[discord.Color] = None):
+        """Embed listing the non-empty messages, or None if there are none."""
+        desc = "\n".join(msg for msg in messages if msg)
+        if not desc:
             return None
         embed_color = color or (discord.Color.blurple() if title == "Send-out" else discord.Color.teal())
-        return discord.Embed(title=title, description="\n".join(messages), color=embed_color)
-
-    async def _send_turn_resolution(self, interaction: discord.Interaction, turn_result: dict):
-        switch_msgs = [msg for msg in (turn_result.get('switch_messages') or []) if msg]
-        switch_embed = self._build_switch_embed(switch_msgs)
-        if switch_embed:
-            await interaction.followup.send(embed=switch_embed)
+        return discord.Embed(title=title, description=desc, color=embed_color)
 
+    def _turn_resolution_embeds(self, turn_result: dict) -> list[discord.Embed]:
+        switch_embed = self._build_switch_embed(turn_result.get('switch_messages') or ())
         turn_msgs = turn_result.get("narration", []) or turn_result.get("messages", [])
-        await interaction.followup.send(embed=self._build_turn_embed(turn_msgs))
+        turn_embed = self._build_turn_embed(turn_msgs)
+        return [switch_embed, turn_embed] if switch_embed else [turn_embed]
 
     async def _prompt_forced_switch(self, interaction: discord.Interaction, battle, battler_id: int):
         if battler_id != battle.trainer.battler_id:
-            await interaction.followup.send(
+            await self._followup(
+                interaction,
                 "Waiting for your opponent to choose their next Pokémon...",
                 ephemeral=True
             )
             return
 
-        fainted = battle.trainer.get_active_pokemon()[0] if battle.trainer.get_active_pokemon() else None
+        active = battle.trainer.get_active_pokemon()
+        fainted = active[0] if active else None
         if fainted:
             desc = (
                 f"**{fainted.species_name}** can no longer fight!\n\n"
@@ -414,7 +565,8 @@ class BattleCog(commands.Cog):
             desc = "Select another healthy Pokémon to continue the battle."
 
         embed = discord.Embed(title="Pokémon Fainted!", description=desc, color=discord.Color.red())
-        await interaction.followup.send(
+        await self._followup(
+            interaction,
             embed=embed,
             view=PartySelectView(battle, battler_id, self.battle_engine, forced=True)
         )
@@ -429,37 +581,30 @@ class BattleCog(commands.Cog):
             winner_name, loser_name = opponent_name, trainer_name
         else:
             desc = "🏆 Battle Over\n\nIt's a draw!"
-            await interaction.followup.send(
+            await self._followup(
+                interaction,
                 embed=discord.Embed(title='Battle Over', description=desc, color=discord.Color.gold())
             )
             self.battle_engine.end_battle(battle.battle_id)
             self._unregister_battle(battle)
             return
 
-        try:
-            from database import PlayerDatabase
-            pdb = PlayerDatabase('data/players.db')
-            party_rows = pdb.get_trainer_party(battle.trainer.battler_id)
-            rows_by_pos = {row.get('party_position', i): row for i, row in enumerate(party_rows)}
-            for i, mon in enumerate(battle.trainer.party):
-                row = rows_by_pos.get(i) or rows_by_pos.get(getattr(mon, 'party_position', i))
-                if row and 'pokemon_id' in row:
-                    pdb.update_pokemon(row['pokemon_id'], {'current_hp': max(0, int(getattr(mon, 'current_hp', 0)))})
-        except Exception:
-            pass
+        await self._save_party_hp(battle)
 
         desc = f"🏆 Battle Over\n\nAll of {loser_name}'s Pokémon have fainted! {winner_name} wins!"
-        await interaction.followup.send(
+        await self._followup(
+            interaction,
             embed=discord.Embed(title='Battle Over', description=desc, color=discord.Color.gold())
         )
 
-        exp_embed = await self._create_exp_embed(battle, interaction)
-        if exp_embed:
-            await interaction.followup.send(embed=exp_embed)
+        if self.exp_handler:
+            exp_embed = await self._create_exp_embed(battle, interaction)
+            if exp_embed:
+                await self._followup(interaction, embed=exp_embed)
 
         ranked_embed = self._build_ranked_result_embed(battle)
         if ranked_embed:
-            await interaction.followup.send(embed=ranked_embed)
+            await self._followup(interaction, embed=ranked_embed)
 
         self.battle_engine.end_battle(battle.battle_id)
         self._unregister_battle(battle)
@@ -467,6 +612,22 @@ class BattleCog(commands.Cog):
         if getattr(battle, 'battle_type', None) == BattleType.WILD:
             await self.send_return_to_encounter_prompt(interaction, battle.trainer.battler_id)
 
+    async def _save_party_hp(self, battle):
+        """Persist the trainer's party HP after a battle in one batched UPDATE, off the event loop."""
+        # Battle Pokémon built by reconstruct_pokemon_from_data carry their row's pokemon_id,
+        # so the party never has to be read back to match rows up
+        updates = [
+            (max(0, int(mon.current_hp or 0)), mon.pokemon_id)
+            for mon in battle.trainer.party
+            if getattr(mon, 'pokemon_id', None)
+        ]
+        if not updates:
+            return
+        try:
+            await asyncio.to_thread(self._get_player_db().bulk_update_hp, updates)
+        except Exception:
+            pass
+
     async def _create_exp_embed(self, battle, interaction: Optional[discord.Interaction] = None) -> Optional[discord.Embed]:
         if not self.exp_handler:
             return None
@@ -497,15 +658,12 @@ class BattleCog(commands.Cog):
 
             if 0 <= opp_active_index < len(opponent_party):
                 defeated_pokemon = opponent_party[opp_active_index]
-
-            if defeated_pokemon is None:
-                for mon in reversed(opponent_party):
-                    if getattr(mon, 'current_hp', 1) <= 0:
-                        defeated_pokemon = mon
-                        break
-
-            if defeated_pokemon is None and opponent_party:
-                defeated_pokemon = opponent_party[-1]
+            else:
+                # Active slot unusable: fall back to the last fainted (or last) party member
+                defeated_pokemon = next(
+                    (mon for mon in reversed(opponent_party) if getattr(mon, 'current_hp', 1) <= 0),
+                    opponent_party[-1]
+                )
 
         if defeated_pokemon is None:
             return None
@@ -627,25 +785,33 @@ class BattleCog(commands.Cog):
             print(f"[BattleCog] Failed to build EXP embed: {exc}")
             return None
 
-    async def _handle_post_turn(self, interaction: discord.Interaction, battle_id: str):
+    async def _handle_post_turn(self, interaction: discord.Interaction, battle_id: str, pending: Optional[list[discord.Embed]] = None):
+        """Send whatever follows a resolved turn. Embeds in ``pending`` (the turn result) share
+        the dazed prompt / battle panel message, or go out first when something else follows."""
+        pending = pending or []
         battle = self.battle_engine.get_battle(battle_id)
         if not battle:
+            if pending:
+                await self._send_embeds(interaction, pending)
             return
 
         if battle.battle_type == BattleType.WILD and getattr(battle, "wild_dazed", False) and not battle.is_over:
-            await self._send_dazed_prompt(interaction, battle)
-            return
-
-        if battle.is_over:
-            await self._finish_battle(interaction, battle)
+            embed, view = self._build_dazed_prompt(battle)
+            await self._send_embeds(interaction, pending + [embed], view=view)
             return
 
-        if battle.phase == 'FORCED_SWITCH' and battle.forced_switch_battler_id:
-            await self._prompt_forced_switch(interaction, battle, battle.forced_switch_battler_id)
+        if battle.is_over or (battle.phase == 'FORCED_SWITCH' and battle.forced_switch_battler_id):
+            if pending:
+                await self._send_embeds(interaction, pending)
+            if battle.is_over:
+                await self._finish_battle(interaction, battle)
+            else:
+                await self._prompt_forced_switch(interaction, battle, battle.forced_switch_battler_id)
             return
 
-        await interaction.followup.send(
-            embed=self._create_battle_embed(battle),
+        await self._send_embeds(
+            interaction,
+            pending + [self._create_battle_embed(battle)],
             view=self._create_battle_view(battle)
         )
 
@@ -687,8 +853,8 @@ class BattleActionView(discord.ui.View):
 
     @discord.ui.button(label="⚔️ Fight", style=discord.ButtonStyle.danger, row=0)
     async def fight_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        # Always grab the freshest battle state
-        battle = self.engine.get_battle(self.battle_id) or self.battle
+        # BattleState is updated in place, so the instance captured with this view is the live one
+        battle = self.battle
         if not battle:
             await interaction.response.send_message("Battle not found.", ephemeral=True)
             return
@@ -713,7 +879,7 @@ class BattleActionView(discord.ui.View):
 
     @discord.ui.button(label="🔄 Switch", style=discord.ButtonStyle.primary, row=0)
     async def switch_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        battle = self.engine.get_battle(self.battle_id) or self.battle
+        battle = self.battle
         if not battle:
             await interaction.response.send_message("Battle not found.", ephemeral=True)
             return
@@ -738,7 +904,7 @@ class BattleActionView(discord.ui.View):
 
     @discord.ui.button(label="🎒 Bag", style=discord.ButtonStyle.secondary, row=0)
     async def bag_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        battle = self.engine.get_battle(self.battle_id) or self.battle
+        battle = self.battle
         if not battle:
             await interaction.response.send_message("Battle not found.", ephemeral=True)
             return
@@ -758,23 +924,20 @@ class BattleActionView(discord.ui.View):
         await interaction.response.send_message(embed=embed, view=ForfeitConfirmView(self), ephemeral=True)
 
     async def _handle_forfeit(self, interaction: discord.Interaction):
+        cog = self.cog
         battle = self.engine.get_battle(self.battle_id)
         if not battle:
-            await interaction.followup.send("Battle not found.", ephemeral=True)
+            await cog._followup(interaction, "Battle not found.", ephemeral=True)
             return
         if battle.is_over:
-            await interaction.followup.send("The battle is already over.", ephemeral=True)
+            await cog._followup(interaction, "The battle is already over.", ephemeral=True)
             return
         if self.battler_id == battle.trainer.battler_id:
             battle.winner = 'opponent'
         else:
             battle.winner = 'trainer'
         battle.is_over = True
-        cog = self.cog or interaction.client.get_cog("BattleCog")
-        if cog:
-            await cog._finish_battle(interaction, battle)
-        else:
-            self.engine.end_battle(self.battle_id)
+        await cog._finish_battle(interaction, battle)
 
 class MoveSelectView(discord.ui.View):
     def __init__(self, battle, battler_id: int, engine: BattleEngine):
@@ -786,7 +949,8 @@ class MoveSelectView(discord.ui.View):
 
         # Figure out which active Pokémon belongs to this battler
         battler = battle.trainer if battler_id == battle.trainer.battler_id else battle.opponent
-        active_pokemon = battler.get_active_pokemon()[0] if battler.get_active_pokemon() else None
+        active = battler.get_active_pokemon()
+        active_pokemon = active[0] if active else None
 
         if not active_pokemon:
             return
@@ -826,123 +990,106 @@ class MoveButton(discord.ui.Button):
 
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.defer()
+        cog = interaction.client.get_cog("BattleCog")
+        if not cog:
+            await interaction.followup.send("Battle system is not available right now.", ephemeral=True)
+            return
+
         action = BattleAction(action_type='move', battler_id=self.battler_id, move_id=self.move_id, target_position=0)
         res = self.engine.register_action(self.battle_id, self.battler_id, action)
-        cog = interaction.client.get_cog("BattleCog")
 
         # If the other trainer hasn't chosen yet, just notify this user and stop.
         if not res.get("ready_to_resolve"):
-            await interaction.followup.send(
+            await cog._followup(
+                interaction,
                 "Move selected! Waiting for the other trainer to choose...",
                 ephemeral=True,
             )
             return
 
-        if res.get("ready_to_resolve") and cog:
-            turn = await self.engine.process_turn(self.battle_id)
-            # Compose a narration + refreshed battle panel
-            msgs = turn.get("narration", [])
-            if not msgs and "messages" in turn:
-                msgs = turn["messages"]
-            # Add spacing between messages for better readability
-            if msgs:
-                spaced_msgs = []
-                for msg in msgs[-6:]:
-                    spaced_msgs.append(msg)
-                    spaced_msgs.append("")  # Add blank line after each message
-                # Remove trailing blank line
-                if spaced_msgs and spaced_msgs[-1] == "":
-                    spaced_msgs.pop()
-                desc = "\n".join(spaced_msgs)
-            else:
-                desc = "The turn resolves."
-            e = discord.Embed(title="Turn Result", description=desc, color=discord.Color.orange())
-            await interaction.followup.send(embed=e)
-            # Send separate AI send-out embed if present
-            switch_msgs = turn.get('switch_messages') or []
-            if switch_msgs:
-                send_embed = discord.Embed(title='Send-out', description='\n\n'.join(switch_msgs), color=discord.Color.blurple())
-                await interaction.followup.send(embed=send_embed)
+        try:
+            # Shielded so a timeout here never leaves the engine half way through a turn
+            turn = await asyncio.wait_for(asyncio.shield(self.engine.process_turn(self.battle_id)), TURN_RESOLVE_TIMEOUT)
+        except asyncio.TimeoutError:
+            await cog._followup(interaction, TURN_TIMEOUT_TEXT, ephemeral=True)
+            return
+
+        # Everything the turn produces is gathered here and sent as one message where possible
+        embeds: list[discord.Embed] = []
+        # Compose a narration + refreshed battle panel
+        msgs = turn.get("narration", [])
+        if not msgs and "messages" in turn:
+            msgs = turn["messages"]
+        embeds.append(cog._build_turn_embed(msgs))
+        # Separate AI send-out embed if present
+        switch_msgs = turn.get('switch_messages') or []
+        if switch_msgs:
+            embeds.append(discord.Embed(title='Send-out', description='\n\n'.join(switch_msgs), color=discord.Color.blurple()))
+
         battle = self.engine.get_battle(self.battle_id)
-        if battle:
-            from cogs.battle_cog import BattleCog  # type: ignore
-            # naive way to get cog from interaction.client
-            cog = interaction.client.get_cog("BattleCog")
-            if cog:
-                refreshed = cog._create_battle_embed(battle)
-                
-                # If this is a wild battle and the opponent is dazed, show the catch prompt instead of the battle panel
-                if battle.battle_type == BattleType.WILD and getattr(battle, 'wild_dazed', False) and not battle.is_over:
-                    await cog._send_dazed_prompt(interaction, battle)
-                    return
-                
-                if turn.get('is_over') or battle.is_over:
-                    # Map engine winner ('trainer'|'opponent'|'draw') to names
-                    result = turn.get('winner') or battle.winner
-                    trainer_name = getattr(battle.trainer, 'battler_name', 'Trainer')
-                    opponent_name = getattr(battle.opponent, 'battler_name', 'Opponent')
-                    if result == 'trainer':
-                        winner_name, loser_name = trainer_name, opponent_name
-                    elif result == 'opponent':
-                        winner_name, loser_name = opponent_name, trainer_name
-                    else:
-                        desc = "🏆 Battle Over\n\nIt's a draw!"
-                        await interaction.followup.send(embed=discord.Embed(title='Battle Over', description=desc, color=discord.Color.gold()))
-                        
-                        # Clean up battle
-                        self.engine.end_battle(self.battle_id)
-                        if hasattr(cog, '_unregister_battle'):
-                            cog._unregister_battle(battle)
-                        return
-                    # Persist party HP to database (player side)
-                    try:
-                        from database import PlayerDatabase
-                        pdb = PlayerDatabase('data/players.db')
-                        party_rows = pdb.get_trainer_party(battle.trainer.battler_id)
-                        rows_by_pos = {row.get('party_position', i): row for i, row in enumerate(party_rows)}
-                        for i, mon in enumerate(battle.trainer.party):
-                            row = rows_by_pos.get(i) or rows_by_pos.get(getattr(mon, 'party_position', i))
-                            if row and 'pokemon_id' in row:
-                                pdb.update_pokemon(row['pokemon_id'], {'current_hp': max(0, int(getattr(mon, 'current_hp', 0))) })
-                    except Exception:
-                        pass
-                    
-                    # Send battle over message
-                    desc = f"🏆 Battle Over\n\nAll of {loser_name}'s Pokémon have fainted! {winner_name} wins!"
-                    await interaction.followup.send(embed=discord.Embed(title='Battle Over', description=desc, color=discord.Color.gold()))
-                    
-                    # Send exp gain embed if trainer won
-                    create_exp_embed = getattr(cog, "_create_exp_embed", None)
-                    if create_exp_embed:
-                        exp_embed = await create_exp_embed(battle, interaction)
-                        if exp_embed:
-                            await interaction.followup.send(embed=exp_embed)
-                    
-                    # Clean up battle
-                    self.engine.end_battle(self.battle_id)
-                    if hasattr(cog, '_unregister_battle'):
-                        cog._unregister_battle(battle)
-
-                    if getattr(battle, 'battle_type', None) == BattleType.WILD:
-                        await cog.send_return_to_encounter_prompt(interaction, interaction.user.id)
-                else:
-                    # Let BattleCog handle post-turn logic: forced switches, KO prompts, etc.
-                    await cog._handle_post_turn(interaction, self.battle_id)
-        
+        if not battle:
+            await cog._send_embeds(interaction, embeds)
+            return
+
+        # If this is a wild battle and the opponent is dazed, show the catch prompt instead of the battle panel
+        if battle.battle_type == BattleType.WILD and getattr(battle, 'wild_dazed', False) and not battle.is_over:
+            await cog._handle_post_turn(interaction, self.battle_id, pending=embeds)
+            return
+
+        if not (turn.get('is_over') or battle.is_over):
+            # Let BattleCog handle post-turn logic: forced switches, KO prompts, etc.
+            await cog._handle_post_turn(interaction, self.battle_id, pending=embeds)
+            return
+
+        # Map engine winner ('trainer'|'opponent'|'draw') to names
+        result = turn.get('winner') or battle.winner
+        trainer_name = getattr(battle.trainer, 'battler_name', 'Trainer')
+        opponent_name = getattr(battle.opponent, 'battler_name', 'Opponent')
+        if result == 'trainer':
+            winner_name, loser_name = trainer_name, opponent_name
+        elif result == 'opponent':
+            winner_name, loser_name = opponent_name, trainer_name
+        else:
+            desc = "🏆 Battle Over\n\nIt's a draw!"
+            embeds.append(discord.Embed(title='Battle Over', description=desc, color=discord.Color.gold()))
+            await cog._send_embeds(interaction, embeds)
+
+            # Clean up battle
+            self.engine.end_battle(self.battle_id)
+            cog._unregister_battle(battle)
+            return
+        # Persist party HP to database (player side)
+        await cog._save_party_hp(battle)
+
+        # Battle over message
+        desc = f"🏆 Battle Over\n\nAll of {loser_name}'s Pokémon have fainted! {winner_name} wins!"
+        embeds.append(discord.Embed(title='Battle Over', description=desc, color=discord.Color.gold()))
+
+        # Exp gain embed if trainer won
+        exp_embed = await cog._create_exp_embed(battle, interaction)
+        if exp_embed:
+            embeds.append(exp_embed)
+        await cog._send_embeds(interaction, embeds)
+
+        # Clean up battle
+        self.engine.end_battle(self.battle_id)
+        cog._unregister_battle(battle)
+
+        if getattr(battle, 'battle_type', None) == BattleType.WILD:
+            await cog.send_return_to_encounter_prompt(interaction, interaction.user.id)
+
 class PartySelect(discord.ui.Select):
     def __init__(self, battle, battler_id: int, forced: bool = False):
         self.battle = battle
         self.battler_id = battler_id
         self.forced = forced
-        options = []
         battler = battle.trainer if battler_id == battle.trainer.battler_id else battle.opponent
-        party = battler.party
-        active_index = battler.active_positions[0]  # Get actual active position
-        for idx, mon in enumerate(party):
-            name = getattr(mon, "species_name", f"Slot {idx+1}")
-            hp = f"{getattr(mon, 'current_hp', 0)}/{getattr(mon, 'max_hp', 1)}"
-            disabled = (idx == active_index) or getattr(mon, "current_hp", 0) <= 0
-            options.append(discord.SelectOption(label=name, description=f"HP {hp}", value=str(idx), default=False))
+        # The same party state comes up in every switch prompt until something takes damage
+        party_state = tuple((mon.species_name, mon.current_hp, mon.max_hp) for mon in battler.party)
+        options = [
+            discord.SelectOption(label=label, description=description, value=value, default=False)
+            for label, description, value in _party_option_fields(party_state)
+        ]
         placeholder = "Choose a Pokémon to send out" if forced else "Choose a Pokémon to switch in"
         super().__init__(placeholder=placeholder, min_values=1, max_values=1, options=options)
 
@@ -950,39 +1097,45 @@ class PartySelect(discord.ui.Select):
         await interaction.response.defer()
         idx = int(self.values[0])
         cog = interaction.client.get_cog("BattleCog")
+        if not cog:
+            await interaction.followup.send("Battle system is not available right now.", ephemeral=True)
+            return
         parent_view = getattr(self, 'view', None)
         if not parent_view:
-            await interaction.followup.send("That switch prompt expired.", ephemeral=True)
+            await cog._followup(interaction, "That switch prompt expired.", ephemeral=True)
             return
 
         if self.forced:
             result = parent_view.engine.force_switch(parent_view.battle_id, self.battler_id, idx)
             if result.get("error"):
-                await interaction.followup.send(result["error"], ephemeral=True)
+                await cog._followup(interaction, result["error"], ephemeral=True)
                 return
             messages = result.get('messages', [])
-            if cog:
-                send_embed = cog._build_switch_embed(messages, title="Send-out")
-                if send_embed:
-                    await interaction.followup.send(embed=send_embed)
-                battle = parent_view.engine.get_battle(parent_view.battle_id)
-                if battle:
-                    await interaction.followup.send(
-                        embed=cog._create_battle_embed(battle),
-                        view=cog._create_battle_view(battle),
-                    )
-            else:
-                text = "\n".join(messages) or "A new Pokémon entered the battle."
-                await interaction.followup.send(text)
+            # The send-out and the refreshed battle panel go out as one message
+            send_embed = cog._build_switch_embed(messages, title="Send-out")
+            embeds = [send_embed] if send_embed else []
+            battle = parent_view.engine.get_battle(parent_view.battle_id)
+            if battle:
+                embeds.append(cog._create_battle_embed(battle))
+                await cog._send_embeds(interaction, embeds, view=cog._create_battle_view(battle))
+            elif embeds:
+                await cog._send_embeds(interaction, embeds)
             return
 
         action = BattleAction(action_type='switch', battler_id=self.battler_id, switch_to_position=idx)
         res = parent_view.engine.register_action(parent_view.battle_id, self.battler_id, action)
-        if res.get("ready_to_resolve") and cog:
-            turn = await parent_view.engine.process_turn(parent_view.battle_id)
-            await cog._send_turn_resolution(interaction, turn)
-        if cog:
-            await cog._handle_post_turn(interaction, parent_view.battle_id)
+        pending = []
+        if res.get("ready_to_resolve"):
+            try:
+                turn = await asyncio.wait_for(
+                    asyncio.shield(parent_view.engine.process_turn(parent_view.battle_id)), TURN_RESOLVE_TIMEOUT
+                )
+            except asyncio.TimeoutError:
+                await cog._followup(interaction, TURN_TIMEOUT_TEXT, ephemeral=True)
+                return
+            pending = cog._turn_resolution_embeds(turn)
+        # The turn result shares a message with whatever follows it where possible
+        await cog._handle_post_turn(interaction, parent_view.battle_id, pending=pending)
 class PartySelectView(discord.ui.View):
     def __init__(self, battle, battler_id: int, engine: BattleEngine, forced: bool = False):
         super().__init__(timeout=60)
@@ -1017,16 +1170,22 @@ class BagView(discord.ui.View):
 class DazedCatchView(discord.ui.View):
     """Prompt that lets trainers confirm whether they will catch a dazed wild Pokemon."""
 
-    def __init__(self, battle_cog: BattleCog, battle_id: str):
+    def __init__(self, battle_cog: BattleCog, battle_id: str, discord_user_id: Optional[int] = None):
         super().__init__(timeout=120)
         self.battle_cog = battle_cog
         self.battle_id = battle_id
+        self.discord_user_id = discord_user_id
+        # The trainer's balls, read once for the prompt; a throw still re-checks its ball
+        self._balls = battle_cog._get_ball_inventory(discord_user_id) if discord_user_id is not None else None
 
     @discord.ui.button(label="Yes", style=discord.ButtonStyle.success)
     async def yes(self, interaction: discord.Interaction, button: discord.ui.Button):
         """Player chooses to attempt a guaranteed capture on a dazed target."""
 
-        balls = self.battle_cog._get_ball_inventory(interaction.user.id)
+        if self._balls is not None and interaction.user.id == self.discord_user_id:
+            balls = self._balls
+        else:
+            balls = self.battle_cog._get_ball_inventory(interaction.user.id)
         if not balls:
             await interaction.response.edit_message(
                 content="❌ You have no Poke Balls available!",
@@ -1,6 +1,8 @@
 """Registration Cog - Handles /register command and new trainer setup"""
 
 import asyncio
+from dataclasses import dataclass
+from typing import Optional
 
 import discord
 from discord import app_commands
@@ -8,7 +10,17 @@ from discord.ext import commands
 from ui.embeds import EmbedBuilder
 from ui.buttons import (RegistrationView, StarterSelectView, 
                        SocialStatsView, ConfirmationView)
-from models import Pokemon
+
+
+@dataclass(slots=True)
+class PendingRegistration:
+    """Choices made so far in one trainer's registration flow"""
+    user_id: int
+    trainer_name: str
+    avatar_url: Optional[str] = None
+    starter_species: Optional[dict] = None
+    boon_stat: Optional[str] = None
+    bane_stat: Optional[str] = None
 
 
 class RegistrationModal(discord.ui.Modal, title="Trainer Registration"):
@@ -30,12 +42,12 @@ class RegistrationModal(discord.ui.Modal, title="Trainer Registration"):
     
     async def on_submit(self, interaction: discord.Interaction):
         """Handle modal submission"""
-        # Store data temporarily on the client
-        interaction.client.temp_registration_data = {
-            'user_id': interaction.user.id,
-            'trainer_name': self.trainer_name.value,
-            'avatar_url': self.avatar_url.value if self.avatar_url.value else None
-        }
+        # Store data temporarily on the client, per user so simultaneous registrations don't collide
+        interaction.client.pending_registrations[interaction.user.id] = PendingRegistration(
+            user_id=interaction.user.id,
+            trainer_name=self.trainer_name.value,
+            avatar_url=self.avatar_url.value if self.avatar_url.value else None
+        )
 
         # Acknowledge the modal to avoid 'Unknown interaction' errors
         await interaction.response.defer(ephemeral=True)
@@ -77,7 +89,7 @@ class RegistrationModal(discord.ui.Modal, title="Trainer Registration"):
         # Check the selected species on the view
         if view.selected_species:
             starter_data = view.selected_species
-            interaction.client.temp_registration_data['starter_species'] = starter_data
+            interaction.client.pending_registrations[interaction.user.id].starter_species = starter_data
 
             # Move to social stats selection
             await self.start_social_stats_selection(interaction)
@@ -89,7 +101,8 @@ class RegistrationModal(discord.ui.Modal, title="Trainer Registration"):
 
     async def start_social_stats_selection(self, interaction: discord.Interaction):
         """Start social stats selection"""
-        if 'starter_species' not in interaction.client.temp_registration_data:
+        data = interaction.client.pending_registrations.get(interaction.user.id)
+        if not data or not data.starter_species:
             await interaction.followup.send(
                 "❌ Starter selection missing. Please run `/register` again.",
                 ephemeral=True
@@ -119,16 +132,16 @@ class RegistrationModal(discord.ui.Modal, title="Trainer Registration"):
         
         if view.boon_stat and view.bane_stat:
             # Store social stat choices
-            interaction.client.temp_registration_data['boon_stat'] = view.boon_stat
-            interaction.client.temp_registration_data['bane_stat'] = view.bane_stat
+            data.boon_stat = view.boon_stat
+            data.bane_stat = view.bane_stat
             
             # Show summary and confirm
             await self.show_registration_summary(interaction)
     
     async def show_registration_summary(self, interaction: discord.Interaction):
         """Show final summary and confirmation"""
-        data = interaction.client.temp_registration_data
-        starter_species = data.get('starter_species')
+        data = interaction.client.pending_registrations.get(interaction.user.id)
+        starter_species = data.starter_species if data else None
 
         if not starter_species:
             await interaction.followup.send(
@@ -138,11 +151,11 @@ class RegistrationModal(discord.ui.Modal, title="Trainer Registration"):
             return
 
         embed = EmbedBuilder.registration_summary(
-            trainer_name=data['trainer_name'],
+            trainer_name=data.trainer_name,
             starter_species=starter_species['name'],
-            boon_stat=data['boon_stat'],
-            bane_stat=data['bane_stat'],
-            avatar_url=data.get('avatar_url')
+            boon_stat=data.boon_stat,
+            bane_stat=data.bane_stat,
+            avatar_url=data.avatar_url
         )
         
         view = ConfirmationView()
@@ -162,18 +175,29 @@ class RegistrationModal(discord.ui.Modal, title="Trainer Registration"):
     
     async def complete_registration(self, interaction: discord.Interaction):
         """Complete registration and create trainer + starter"""
-        data = interaction.client.temp_registration_data
+        # Taken out before the write so a failed or raising registration never leaves it behind
+        data = interaction.client.pending_registrations.pop(interaction.user.id, None)
+        if not data or not data.starter_species:
+            await interaction.followup.send(
+                "❌ Registration data missing. Please run `/register` again.",
+                ephemeral=True
+            )
+            return
         
-        # Create trainer profile
-        success = interaction.client.player_manager.create_player(
-            discord_user_id=data['user_id'],
-            trainer_name=data['trainer_name'],
-            avatar_url=data.get('avatar_url'),
-            boon_stat=data['boon_stat'],
-            bane_stat=data['bane_stat']
+        # The starter is built, and the trainer profile, starter and Pokedex entry are
+        # written in one transaction, on a worker thread
+        starter_species = data.starter_species
+        starter_id = await asyncio.to_thread(
+            interaction.client.player_manager.register_new_trainer,
+            discord_user_id=data.user_id,
+            trainer_name=data.trainer_name,
+            starter_species=starter_species,
+            avatar_url=data.avatar_url,
+            boon_stat=data.boon_stat,
+            bane_stat=data.bane_stat
         )
         
-        if not success:
+        if not starter_id:
             embed = EmbedBuilder.error(
                 "Registration Failed",
                 "You already have a trainer profile! Use `/menu` to continue your journey."
@@ -181,42 +205,21 @@ class RegistrationModal(discord.ui.Modal, title="Trainer Registration"):
             await interaction.followup.send(embed=embed, ephemeral=True)
             return
         
-        # Create starter Pokemon
-        starter_species = data['starter_species']
-        starter = Pokemon(
-            species_data=starter_species,
-            level=5,
-            owner_discord_id=data['user_id']
-        )
-        
-        # Add to party
-        interaction.client.player_manager.add_pokemon_to_party(starter)
-        
-        # Add to Pokedex
-        interaction.client.player_manager.add_pokedex_seen(
-            data['user_id'],
-            starter_species['dex_number']
-        )
-        
         # Success message
         embed = discord.Embed(
             title="🎉 Registration Complete!",
             description=(
-                f"Welcome to (uhhh idk island name), **{data['trainer_name']}**!\n\n"
+                f"Welcome to (uhhh idk island name), **{data.trainer_name}**!\n\n"
                 f"Your adventure begins with **{starter_species['name']}** at your side.\n\n"
                 f"Use `/menu` to access all features and start your journey!"
             ),
             color=discord.Color.gold()
         )
         
-        if data.get('avatar_url'):
-            embed.set_thumbnail(url=data['avatar_url'])
+        if data.avatar_url:
+            embed.set_thumbnail(url=data.avatar_url)
         
         await interaction.followup.send(embed=embed, ephemeral=False)
-        
-        # Clean up temp data
-        if hasattr(interaction.client, 'temp_registration_data'):
-            del interaction.client.temp_registration_data
 
 
 class RegistrationCog(commands.Cog):
@@ -232,7 +235,7 @@ class RegistrationCog(commands.Cog):
         await interaction.response.defer(ephemeral=True)
 
         # Check if already registered
-        if self.bot.player_manager.player_exists(interaction.user.id):
+        if await asyncio.to_thread(self.bot.player_manager.player_exists, interaction.user.id):
             embed = EmbedBuilder.error(
                 "Already Registered",
                 "You already have a trainer profile! Use `/menu` to continue your journey."
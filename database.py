@@ -4,8 +4,11 @@ Database Module - Handles loading game data and player data storage
 
 import json
 import sqlite3
+import threading
+import weakref
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 import uuid
 import re
 import unicodedata
@@ -28,6 +31,8 @@ class SpeciesDatabase:
     def __init__(self, json_path: str):
         with open(json_path, 'r', encoding='utf-8') as f:
             self.data = json.load(f)
+        # Sorted starter list, built on first use (species data never changes after load)
+        self._starters: Optional[tuple] = None
     
     def get_species(self, identifier) -> Optional[Dict]:
         """Get species by dex number or name"""
@@ -61,6 +66,11 @@ class SpeciesDatabase:
     
     def get_all_starters(self) -> List[Dict]:
         """Get all non-legendary Pokemon suitable as starters"""
+        if self._starters is None:
+            self._starters = tuple(self._build_starters())
+        return list(self._starters)
+
+    def _build_starters(self) -> List[Dict]:
         try:
             from config.starters import STARTER_MODE, ALLOWED_STARTERS, EXCLUDED_POKEMON
         except ImportError:
@@ -188,6 +198,10 @@ class ItemsDatabase:
         """Get all items in a category"""
         return [item for item in self.data.values() if item.get('category') == category]
 
+    def get_item_index(self, category: str) -> Dict[str, Dict]:
+        """Map item ID -> item data for every item in a category"""
+        return {item_id: item for item_id, item in self.data.items() if item.get('category') == category}
+
 
 class NaturesDatabase:
     """Loads and queries nature data"""
@@ -205,6 +219,22 @@ class NaturesDatabase:
         return list(self.data.values())
 
 
+# One bit per type, so type tests on hot paths are a single AND (see Pokemon.type_bits)
+TYPE_NAMES = (
+    'normal', 'fire', 'water', 'electric', 'grass', 'ice', 'fighting', 'poison', 'ground',
+    'flying', 'psychic', 'bug', 'rock', 'ghost', 'dragon', 'dark', 'steel', 'fairy',
+)
+TYPE_BITS: Dict[str, int] = {name: 1 << i for i, name in enumerate(TYPE_NAMES)}
+
+
+def type_bits(types) -> int:
+    """OR together the bits for a list of type names (case-insensitive); unknown names add nothing"""
+    bits = 0
+    for t in types:
+        bits |= TYPE_BITS.get(str(t).lower(), 0)
+    return bits
+
+
 class TypeChart:
     """Loads type effectiveness chart"""
     
@@ -212,6 +242,17 @@ class TypeChart:
         with open(json_path, 'r', encoding='utf-8') as f:
             data = json.load(f)
             self.chart = data['type_chart']
+
+        # (attacking_type, defending_types) -> multiplier, filled on demand
+        self._dual_cache: Dict[Tuple[str, Tuple[str, ...]], float] = {}
+
+        # Rock vs. every mono and dual type combo keyed by type_bits(), used by Stealth Rock on each switch-in
+        rock = self.chart.get('rock', {})
+        self._rock_mult_cache: Dict[int, float] = {}
+        for i, first in enumerate(TYPE_NAMES):
+            self._rock_mult_cache[TYPE_BITS[first]] = rock.get(first, 1.0)
+            for second in TYPE_NAMES[i + 1:]:
+                self._rock_mult_cache[TYPE_BITS[first] | TYPE_BITS[second]] = rock.get(first, 1.0) * rock.get(second, 1.0)
     
     def get_effectiveness(self, attacking_type: str, defending_type: str) -> float:
         """Get type effectiveness multiplier"""
@@ -219,9 +260,13 @@ class TypeChart:
     
     def get_dual_effectiveness(self, attacking_type: str, defending_types: List[str]) -> float:
         """Calculate effectiveness against dual-type Pokemon"""
-        multiplier = 1.0
-        for def_type in defending_types:
-            multiplier *= self.get_effectiveness(attacking_type, def_type)
+        key = (attacking_type, tuple(defending_types))
+        multiplier = self._dual_cache.get(key)
+        if multiplier is None:
+            multiplier = 1.0
+            for def_type in defending_types:
+                multiplier *= self.get_effectiveness(attacking_type, def_type)
+            self._dual_cache[key] = multiplier
         return multiplier
 
 
@@ -229,11 +274,29 @@ class TypeChart:
 # PLAYER DATA STORAGE (SQLite database)
 # ============================================================
 
+class _ThreadConnection(sqlite3.Connection):
+    """Connection reused by one thread; close() only discards uncommitted work"""
+
+    def close(self):
+        # Callers still close after each operation; keep that meaning for any
+        # transaction they left open, but hold on to the handle itself
+        if self.in_transaction:
+            self.rollback()
+
+    def shutdown(self):
+        super().close()
+
+
 class PlayerDatabase:
     """Handles player data storage in SQLite"""
     
     def __init__(self, db_path: str = "data/players.db"):
         self.db_path = db_path
+        self._local = threading.local()
+        # Every thread's open connection, so close() can shut them all down;
+        # weak so a finished worker thread's connection is still collected
+        self._connections = weakref.WeakSet()
+        self._connections_lock = threading.Lock()
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         self.init_database()
     
@@ -243,6 +306,10 @@ class PlayerDatabase:
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         
+        # Write-ahead logging: commits append to the log instead of rewriting pages,
+        # and readers don't block the writer. The mode is stored in the database file.
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Trainers table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS trainers (
@@ -369,6 +436,18 @@ class PlayerDatabase:
             )
         """)
         
+        # Party/box listings and counts all filter on owner + in_party
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_pokemon_owner_party
+            ON pokemon_instances (owner_discord_id, in_party)
+        """)
+        
+        # Inventory reads only want items the trainer still holds
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_inventory_user_held
+            ON inventory (discord_user_id, item_id) WHERE quantity > 0
+        """)
+        
         conn.commit()
         conn.close()
 
@@ -433,10 +512,39 @@ class PlayerDatabase:
                 )
 
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
+        """Get this thread's database connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn not in self._connections:
+            # check_same_thread=False only so close() can shut it down from the
+            # main thread; the connection is otherwise used by this thread alone
+            conn = sqlite3.connect(self.db_path, factory=_ThreadConnection, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA mmap_size=268435456")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.add(conn)
         return conn
+
+    @contextmanager
+    def _tx(self):
+        """Cursor for one write; commits on success and rolls back on any error"""
+        conn = self.get_connection()
+        try:
+            yield conn.cursor()
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    def close(self):
+        """Really close every thread's connection (shutdown only)"""
+        with self._connections_lock:
+            connections = list(self._connections)
+            self._connections.clear()
+        for conn in connections:
+            conn.shutdown()
     
     # ============================================================
     # TRAINER OPERATIONS
@@ -450,58 +558,86 @@ class PlayerDatabase:
         cursor = conn.cursor()
         
         try:
-            stats_payload: Dict[str, int] = {}
-            for stat_key in SOCIAL_STAT_ORDER:
-                cap = get_stat_cap(stat_key, boon_stat, bane_stat)
-                base_rank = 1
-                if stat_key == boon_stat:
-                    base_rank = 2
-                elif stat_key == bane_stat:
-                    base_rank = 0
+            self._insert_trainer(cursor, discord_user_id, trainer_name, avatar_url, boon_stat, bane_stat)
+            conn.commit()
+            return True
+        except sqlite3.IntegrityError:
+            return False  # Trainer already exists
+        finally:
+            conn.close()
 
-                stats_payload[f'{stat_key}_rank'] = base_rank
-                stats_payload[f'{stat_key}_points'] = rank_to_points(base_rank, cap)
+    def register_trainer(self, discord_user_id: int, trainer_name: str, starter_data: Dict,
+                         avatar_url: str = None, boon_stat: str = None,
+                         bane_stat: str = None) -> Optional[str]:
+        """Create a trainer, their starter and its Pokedex entry in one transaction.
 
-            fortitude_rank = stats_payload['fortitude_rank']
-            stamina_max = calculate_max_stamina(fortitude_rank)
+        Returns the starter's pokemon_id, or None if the trainer already exists.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
 
+        try:
+            self._insert_trainer(cursor, discord_user_id, trainer_name, avatar_url, boon_stat, bane_stat)
+            pokemon_id = self._insert_pokemon(cursor, starter_data)
             cursor.execute("""
-                INSERT INTO trainers (
-                    discord_user_id, trainer_name, avatar_url,
-                    boon_stat, bane_stat,
-                    heart_rank, heart_points,
-                    insight_rank, insight_points,
-                    charisma_rank, charisma_points,
-                    fortitude_rank, fortitude_points,
-                    will_rank, will_points,
-                    stamina_current, stamina_max
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                discord_user_id,
-                trainer_name,
-                avatar_url,
-                boon_stat,
-                bane_stat,
-                stats_payload['heart_rank'],
-                stats_payload['heart_points'],
-                stats_payload['insight_rank'],
-                stats_payload['insight_points'],
-                stats_payload['charisma_rank'],
-                stats_payload['charisma_points'],
-                stats_payload['fortitude_rank'],
-                stats_payload['fortitude_points'],
-                stats_payload['will_rank'],
-                stats_payload['will_points'],
-                stamina_max,
-                stamina_max
-            ))
-
+                INSERT OR IGNORE INTO pokedex (discord_user_id, species_dex_number)
+                VALUES (?, ?)
+            """, (discord_user_id, starter_data['species_dex_number']))
             conn.commit()
-            return True
+            return pokemon_id
         except sqlite3.IntegrityError:
-            return False  # Trainer already exists
+            conn.rollback()
+            return None  # Trainer already exists
         finally:
             conn.close()
+
+    def _insert_trainer(self, cursor, discord_user_id: int, trainer_name: str,
+                        avatar_url: str = None, boon_stat: str = None, bane_stat: str = None):
+        stats_payload: Dict[str, int] = {}
+        for stat_key in SOCIAL_STAT_ORDER:
+            cap = get_stat_cap(stat_key, boon_stat, bane_stat)
+            base_rank = 1
+            if stat_key == boon_stat:
+                base_rank = 2
+            elif stat_key == bane_stat:
+                base_rank = 0
+
+            stats_payload[f'{stat_key}_rank'] = base_rank
+            stats_payload[f'{stat_key}_points'] = rank_to_points(base_rank, cap)
+
+        fortitude_rank = stats_payload['fortitude_rank']
+        stamina_max = calculate_max_stamina(fortitude_rank)
+
+        cursor.execute("""
+            INSERT INTO trainers (
+                discord_user_id, trainer_name, avatar_url,
+                boon_stat, bane_stat,
+                heart_rank, heart_points,
+                insight_rank, insight_points,
+                charisma_rank, charisma_points,
+                fortitude_rank, fortitude_points,
+                will_rank, will_points,
+                stamina_current, stamina_max
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            discord_user_id,
+            trainer_name,
+            avatar_url,
+            boon_stat,
+            bane_stat,
+            stats_payload['heart_rank'],
+            stats_payload['heart_points'],
+            stats_payload['insight_rank'],
+            stats_payload['insight_points'],
+            stats_payload['charisma_rank'],
+            stats_payload['charisma_points'],
+            stats_payload['fortitude_rank'],
+            stats_payload['fortitude_points'],
+            stats_payload['will_rank'],
+            stats_payload['will_points'],
+            stamina_max,
+            stamina_max
+        ))
     
     def get_trainer(self, discord_user_id: int) -> Optional[Dict]:
         """Get trainer by Discord ID"""
@@ -520,23 +656,39 @@ class PlayerDatabase:
         """Check if trainer exists"""
         return self.get_trainer(discord_user_id) is not None
     
-    def update_trainer(self, discord_user_id: int, **kwargs):
-        """Update trainer fields"""
+    def get_recent_trainer_ids(self, days: int = 7, limit: Optional[int] = None) -> List[int]:
+        """Discord IDs of trainers updated in the last `days` days, most recent first"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        # Build UPDATE query dynamically
-        fields = ', '.join([f"{key} = ?" for key in kwargs.keys()])
-        values = list(kwargs.values()) + [discord_user_id]
-        
-        cursor.execute(f"""
-            UPDATE trainers 
-            SET {fields}, updated_at = CURRENT_TIMESTAMP
-            WHERE discord_user_id = ?
-        """, values)
+        # LIMIT -1 means no limit in SQLite
+        cursor.execute("""
+            SELECT discord_user_id FROM trainers
+            WHERE updated_at > datetime('now', ?)
+            ORDER BY updated_at DESC
+            LIMIT ?
+        """, (f"-{int(days)} days", -1 if limit is None else int(limit)))
         
-        conn.commit()
+        rows = cursor.fetchall()
         conn.close()
+        
+        return [row['discord_user_id'] for row in rows]
+    
+    def update_trainer(self, discord_user_id: int, **kwargs) -> int:
+        """Update trainer fields; returns the number of rows changed"""
+        with self._tx() as cursor:
+            # Build UPDATE query dynamically
+            fields = ', '.join([f"{key} = ?" for key in kwargs.keys()])
+            values = list(kwargs.values()) + [discord_user_id]
+
+            cursor.execute(f"""
+                UPDATE trainers 
+                SET {fields}, updated_at = CURRENT_TIMESTAMP
+                WHERE discord_user_id = ?
+            """, values)
+
+            updated = cursor.rowcount
+        return updated
     
     # ============================================================
     # POKEMON OPERATIONS
@@ -544,9 +696,12 @@ class PlayerDatabase:
     
     def add_pokemon(self, pokemon_data: Dict) -> str:
         """Add a Pokemon to a trainer's collection"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._tx() as cursor:
+            pokemon_id = self._insert_pokemon(cursor, pokemon_data)
         
+        return pokemon_id
+
+    def _insert_pokemon(self, cursor, pokemon_data: Dict) -> str:
         pokemon_id = pokemon_data.get('pokemon_id', str(uuid.uuid4()))
         
         cursor.execute("""
@@ -596,10 +751,7 @@ class PlayerDatabase:
             pokemon_data.get('can_mega_evolve', 0),
             pokemon_data.get('tera_type')
         ))
-        
-        conn.commit()
-        conn.close()
-        
+
         return pokemon_id
     
     def get_pokemon(self, pokemon_id: str) -> Optional[Dict]:
@@ -639,6 +791,28 @@ class PlayerDatabase:
 
         return party
 
+    def count_party(self, discord_user_id: int) -> int:
+        """Number of Pokemon in trainer's party"""
+        return self._count_pokemon(discord_user_id, 1)
+
+    def count_boxes(self, discord_user_id: int) -> int:
+        """Number of Pokemon in trainer's boxes"""
+        return self._count_pokemon(discord_user_id, 0)
+
+    def _count_pokemon(self, discord_user_id: int, in_party: int) -> int:
+        conn = self.get_connection()
+        cursor = conn.cursor()
+
+        cursor.execute("""
+            SELECT COUNT(*) FROM pokemon_instances
+            WHERE owner_discord_id = ? AND in_party = ?
+        """, (discord_user_id, in_party))
+
+        count = cursor.fetchone()[0]
+        conn.close()
+
+        return count
+
     def get_players_in_location(self, location_id: str) -> List[Dict]:
         """Return all trainers currently registered at a specific location."""
         conn = self.get_connection()
@@ -676,26 +850,44 @@ class PlayerDatabase:
 
         return boxes
 
-    def heal_party(self, discord_user_id: int) -> int:
-        """Restore all party Pokémon HP and clear their major status conditions."""
+    def get_all_pokemon(self, discord_user_id: int) -> List[Dict]:
+        """Get trainer's party followed by their boxed Pokemon"""
         conn = self.get_connection()
         cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT * FROM pokemon_instances 
+            WHERE owner_discord_id = ? AND in_party IN (0, 1)
+            ORDER BY in_party DESC, party_position, box_position
+        """, (discord_user_id,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        pokemon_list = []
+        for row in rows:
+            pokemon = dict(row)
+            pokemon['moves'] = json.loads(pokemon['moves'])
+            pokemon_list.append(pokemon)
 
-        cursor.execute(
-            """
-            UPDATE pokemon_instances
-            SET current_hp = max_hp,
-                status_condition = NULL
-            WHERE owner_discord_id = ?
-              AND in_party = 1
-              AND (current_hp < max_hp OR status_condition IS NOT NULL)
-            """,
-            (discord_user_id,),
-        )
+        return pokemon_list
 
-        affected = cursor.rowcount
-        conn.commit()
-        conn.close()
+    def heal_party(self, discord_user_id: int) -> int:
+        """Restore all party Pokémon HP and clear their major status conditions."""
+        with self._tx() as cursor:
+            cursor.execute(
+                """
+                UPDATE pokemon_instances
+                SET current_hp = max_hp,
+                    status_condition = NULL
+                WHERE owner_discord_id = ?
+                  AND in_party = 1
+                  AND (current_hp < max_hp OR status_condition IS NOT NULL)
+                """,
+                (discord_user_id,),
+            )
+
+            affected = cursor.rowcount
         return affected
     
     # ============================================================
@@ -718,6 +910,22 @@ class PlayerDatabase:
         finally:
             conn.close()
     
+    def has_pokedex_entry(self, discord_user_id: int, species_dex_number: int) -> bool:
+        """Check whether a trainer has seen this species (served by the pokedex primary key)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT 1 FROM pokedex
+            WHERE discord_user_id = ? AND species_dex_number = ?
+            LIMIT 1
+        """, (discord_user_id, species_dex_number))
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        return row is not None
+    
     def get_pokedex(self, discord_user_id: int) -> List[int]:
         """Get list of seen species dex numbers"""
         conn = self.get_connection()
@@ -739,13 +947,13 @@ class PlayerDatabase:
     # ============================================================
     
     def get_inventory(self, discord_user_id: int) -> List[Dict]:
-        """Get trainer's inventory"""
+        """Get trainer's inventory (quantity > 0)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         
         cursor.execute("""
             SELECT * FROM inventory
-            WHERE discord_user_id = ?
+            WHERE discord_user_id = ? AND quantity > 0
             ORDER BY item_id
         """, (discord_user_id,))
         
@@ -756,70 +964,59 @@ class PlayerDatabase:
     
     def add_item(self, discord_user_id: int, item_id: str, quantity: int = 1):
         """Add item(s) to inventory (creates or updates)"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Check if item already exists
-        cursor.execute("""
-            SELECT quantity FROM inventory
-            WHERE discord_user_id = ? AND item_id = ?
-        """, (discord_user_id, item_id))
-        
-        row = cursor.fetchone()
-        
-        if row:
-            # Update existing
-            new_quantity = row['quantity'] + quantity
+        with self._tx() as cursor:
+            # Check if item already exists
             cursor.execute("""
-                UPDATE inventory
-                SET quantity = ?
+                SELECT quantity FROM inventory
                 WHERE discord_user_id = ? AND item_id = ?
-            """, (new_quantity, discord_user_id, item_id))
-        else:
-            # Insert new
-            cursor.execute("""
-                INSERT INTO inventory (discord_user_id, item_id, quantity)
-                VALUES (?, ?, ?)
-            """, (discord_user_id, item_id, quantity))
-        
-        conn.commit()
-        conn.close()
+            """, (discord_user_id, item_id))
+
+            row = cursor.fetchone()
+
+            if row:
+                # Update existing
+                new_quantity = row['quantity'] + quantity
+                cursor.execute("""
+                    UPDATE inventory
+                    SET quantity = ?
+                    WHERE discord_user_id = ? AND item_id = ?
+                """, (new_quantity, discord_user_id, item_id))
+            else:
+                # Insert new
+                cursor.execute("""
+                    INSERT INTO inventory (discord_user_id, item_id, quantity)
+                    VALUES (?, ?, ?)
+                """, (discord_user_id, item_id, quantity))
     
     def remove_item(self, discord_user_id: int, item_id: str, quantity: int = 1) -> bool:
         """Remove item(s) from inventory. Returns True if successful."""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Check current quantity
-        cursor.execute("""
-            SELECT quantity FROM inventory
-            WHERE discord_user_id = ? AND item_id = ?
-        """, (discord_user_id, item_id))
-        
-        row = cursor.fetchone()
-        
-        if not row or row['quantity'] < quantity:
-            conn.close()
-            return False  # Not enough items
-        
-        new_quantity = row['quantity'] - quantity
-        
-        if new_quantity <= 0:
-            # Remove item entirely
+        with self._tx() as cursor:
+            # Check current quantity
             cursor.execute("""
-                DELETE FROM inventory
+                SELECT quantity FROM inventory
                 WHERE discord_user_id = ? AND item_id = ?
             """, (discord_user_id, item_id))
-        else:
-            # Update quantity
-            cursor.execute("""
-                UPDATE inventory
-                SET quantity = ?
-                WHERE discord_user_id = ? AND item_id = ?
-            """, (new_quantity, discord_user_id, item_id))
-        
-        conn.commit()
-        conn.close()
+
+            row = cursor.fetchone()
+
+            if not row or row['quantity'] < quantity:
+                return False  # Not enough items
+
+            new_quantity = row['quantity'] - quantity
+
+            if new_quantity <= 0:
+                # Remove item entirely
+                cursor.execute("""
+                    DELETE FROM inventory
+                    WHERE discord_user_id = ? AND item_id = ?
+                """, (discord_user_id, item_id))
+            else:
+                # Update quantity
+                cursor.execute("""
+                    UPDATE inventory
+                    SET quantity = ?
+                    WHERE discord_user_id = ? AND item_id = ?
+                """, (new_quantity, discord_user_id, item_id))
         return True
     
     def get_item_quantity(self, discord_user_id: int, item_id: str) -> int:
@@ -843,35 +1040,76 @@ class PlayerDatabase:
         if not updates:
             return False
         
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        # Build UPDATE query dynamically
-        fields = ', '.join([f"{key} = ?" for key in updates.keys()])
-        values = list(updates.values()) + [pokemon_id]
-        
-        cursor.execute(f"""
-            UPDATE pokemon_instances 
-            SET {fields}
-            WHERE pokemon_id = ?
-        """, values)
-        
-        conn.commit()
-        conn.close()
+        with self._tx() as cursor:
+            # Build UPDATE query dynamically
+            fields = ', '.join([f"{key} = ?" for key in updates.keys()])
+            values = list(updates.values()) + [pokemon_id]
+
+            cursor.execute(f"""
+                UPDATE pokemon_instances 
+                SET {fields}
+                WHERE pokemon_id = ?
+            """, values)
         return True
     
+    def bulk_update_hp(self, updates: List[Tuple[int, str]]) -> bool:
+        """Set current_hp for several Pokemon in one transaction; updates are (current_hp, pokemon_id)"""
+        if not updates:
+            return False
+
+        with self._tx() as cursor:
+            cursor.executemany("""
+                UPDATE pokemon_instances
+                SET current_hp = ?
+                WHERE pokemon_id = ?
+            """, updates)
+        return True
+
+    def swap_party_positions(self, pokemon_id_1: str, pokemon_id_2: str, position_1: int, position_2: int) -> bool:
+        """Give pokemon_id_1 position_2 and pokemon_id_2 position_1 in a single UPDATE"""
+        with self._tx() as cursor:
+            cursor.execute("""
+                UPDATE pokemon_instances
+                SET party_position = CASE pokemon_id WHEN ? THEN ? WHEN ? THEN ? END
+                WHERE pokemon_id IN (?, ?)
+            """, (pokemon_id_1, position_2, pokemon_id_2, position_1, pokemon_id_1, pokemon_id_2))
+
+            success = cursor.rowcount == 2
+        return success
+    
+    def bulk_update_positions(self, updates: List[Tuple[Optional[int], Optional[int], str]]) -> bool:
+        """
+        Set party/box positions for several Pokemon in one transaction; updates are
+        (party_position, box_position, pokemon_id). Only the non-None column of each
+        update is written, so a party reorder leaves box_position alone and vice versa.
+        """
+        party_updates = [(party, pokemon_id) for party, _, pokemon_id in updates if party is not None]
+        box_updates = [(box, pokemon_id) for _, box, pokemon_id in updates if box is not None]
+        if not party_updates and not box_updates:
+            return False
+
+        with self._tx() as cursor:
+            if party_updates:
+                cursor.executemany("""
+                    UPDATE pokemon_instances
+                    SET party_position = ?
+                    WHERE pokemon_id = ?
+                """, party_updates)
+            if box_updates:
+                cursor.executemany("""
+                    UPDATE pokemon_instances
+                    SET box_position = ?
+                    WHERE pokemon_id = ?
+                """, box_updates)
+        return True
+
     def delete_pokemon(self, pokemon_id: str) -> bool:
         """Delete a Pokemon permanently"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            DELETE FROM pokemon_instances
-            WHERE pokemon_id = ?
-        """, (pokemon_id,))
-        
-        conn.commit()
-        conn.close()
+        with self._tx() as cursor:
+            cursor.execute("""
+                DELETE FROM pokemon_instances
+                WHERE pokemon_id = ?
+            """, (pokemon_id,))
         return True
 
 def delete_player(player_id: int | str) -> bool:
@@ -11,7 +11,7 @@ import json
 from status_conditions import StatusType, VolatileStatus, StatusConditionManager
 
 
-@dataclass
+@dataclass(slots=True)
 class MoveEffect:
     """Represents a move's effect"""
     effect_type: str  # 'status', 'stat_boost', 'heal', 'recoil', 'drain', 'hazard', etc.
@@ -450,7 +450,7 @@ class EffectHandler:
         """Apply major status condition"""
         status = effect.params.get('status')
         
-        if not hasattr(target, 'status_manager'):
+        if getattr(target, 'status_manager', None) is None:
             target.status_manager = StatusConditionManager()
         
         # Check type immunities
@@ -470,7 +470,7 @@ class EffectHandler:
         """Apply volatile status condition"""
         status = effect.params.get('status')
         
-        if not hasattr(target, 'status_manager'):
+        if getattr(target, 'status_manager', None) is None:
             target.status_manager = StatusConditionManager()
         
         # Set duration for certain volatile statuses
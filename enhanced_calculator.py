@@ -20,6 +20,11 @@ class EnhancedDamageCalculator:
         self.moves_db = moves_db
         self.type_chart = type_chart
         self.effect_handler = EffectHandler(moves_db, type_chart)
+        # Resolve the chart flavour once instead of on every damage roll
+        if hasattr(type_chart, 'get_dual_effectiveness'):
+            self._dual_effectiveness = type_chart.get_dual_effectiveness
+        else:
+            self._dual_effectiveness = self._chart_effectiveness
     
     def calculate_damage_with_effects(
         self,
@@ -38,9 +43,9 @@ class EnhancedDamageCalculator:
             (damage, is_critical, effectiveness, effect_messages)
         """
         # Initialize status managers if not present
-        if not hasattr(attacker, 'status_manager'):
+        if getattr(attacker, 'status_manager', None) is None:
             attacker.status_manager = StatusConditionManager()
-        if not hasattr(defender, 'status_manager'):
+        if getattr(defender, 'status_manager', None) is None:
             defender.status_manager = StatusConditionManager()
         
         # Initialize stat stages if not present
@@ -235,13 +240,14 @@ class EnhancedDamageCalculator:
     
     def _get_type_effectiveness(self, attack_type: str, defender_types: List[str]) -> float:
         """Calculate type effectiveness multiplier"""
+        return self._dual_effectiveness(attack_type, defender_types)
+
+    def _chart_effectiveness(self, attack_type: str, defender_types: List[str]) -> float:
+        """Effectiveness for a type chart without get_dual_effectiveness"""
         multiplier = 1.0
         
-        # Handle both TypeChart objects and raw dictionaries
-        if hasattr(self.type_chart, 'get_dual_effectiveness'):
-            # It's a TypeChart object
-            return self.type_chart.get_dual_effectiveness(attack_type, defender_types)
-        elif hasattr(self.type_chart, 'chart'):
+        # Handle both TypeChart-like objects and raw dictionaries
+        if hasattr(self.type_chart, 'chart'):
             # It's a TypeChart object with a chart attribute
             chart = self.type_chart.chart
         else:
@@ -259,7 +265,7 @@ class EnhancedDamageCalculator:
         """
         Apply end-of-turn effects (status damage, etc.)
         """
-        if not hasattr(pokemon, 'status_manager'):
+        if getattr(pokemon, 'status_manager', None) is None:
             return []
         
         return pokemon.status_manager.apply_end_of_turn_effects(pokemon)
@@ -273,7 +279,7 @@ class EnhancedDamageCalculator:
             speed = self.effect_handler.apply_stat_stages(pokemon, speed, 'speed')
         
         # Apply status effects (paralysis halves speed)
-        if hasattr(pokemon, 'status_manager'):
+        if getattr(pokemon, 'status_manager', None) is not None:
             speed = pokemon.status_manager.modify_speed(speed)
         
         return speed
@@ -4,7 +4,8 @@ Handles loading and querying Pokemon learnsets
 """
 
 import json
-from typing import List, Dict, Optional
+import os
+from typing import List, Dict, Optional, Tuple
 
 
 class LearnsetDatabase:
@@ -200,6 +201,22 @@ class LearnsetDatabase:
         return unique_moves
 
 
+# path -> (file mtime, parsed database); lives here so cog reloads and new Pokemon reuse it
+_LOADED: Dict[str, Tuple[int, LearnsetDatabase]] = {}
+
+
+def load_learnsets(filepath: str) -> LearnsetDatabase:
+    """Return the LearnsetDatabase for filepath, re-parsing the JSON only when the file changes"""
+    filepath = str(filepath)
+    mtime = os.stat(filepath).st_mtime_ns
+    cached = _LOADED.get(filepath)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    db = LearnsetDatabase(filepath)
+    _LOADED[filepath] = (mtime, db)
+    return db
+
+
 # Example usage
 if __name__ == "__main__":
     # Test the learnset database
@@ -7,6 +7,8 @@ import json
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
 
+from ability_handler import ability_flags
+from database import type_bits
 from social_stats import (
     SOCIAL_STAT_DEFINITIONS,
     SOCIAL_STAT_ORDER,
@@ -47,6 +49,7 @@ class Pokemon:
         self.species_dex_number = species_data['dex_number']
         self.species_name = species_data['name']
         self.species_data = species_data
+        self.type_bits = type_bits(species_data.get('types', ()))
         self.level = level
         self.owner_discord_id = owner_discord_id
         self.nickname = None
@@ -113,6 +116,17 @@ class Pokemon:
         # Battle state
         self.held_item = None
         self.is_shiny = is_shiny
+
+        # In-battle runtime state (never saved); declared so the battle engine can read it directly
+        self.status_manager = None  # StatusConditionManager, created on first move
+        self.stat_stages = {
+            'attack': 0, 'defense': 0, 'sp_attack': 0,
+            'sp_defense': 0, 'speed': 0, 'evasion': 0, 'accuracy': 0
+        }
+        self._choice_locked_move = None
+        self._consumed_item = None
+        self._consumed_version = 0
+        self._item_cache = None
         
         # Storage
         self.in_party = False
@@ -173,6 +187,36 @@ class Pokemon:
             
             setattr(self, stat, value)
     
+    @property
+    def ability(self) -> Optional[str]:
+        return self._ability
+
+    @ability.setter
+    def ability(self, value: Optional[str]):
+        self._ability = value
+        self.ability_flags = ability_flags(value)
+
+    @property
+    def moves(self) -> List[Dict]:
+        return self._moves
+
+    @moves.setter
+    def moves(self, value: List[Dict]):
+        self._moves = value
+        self._move_index = {m.get('move_id'): i for i, m in enumerate(value)}
+
+    def get_move_slot(self, move_id: str) -> Optional[Dict]:
+        """Return the known move dict for move_id (with its PP), or None"""
+        idx = self._move_index.get(move_id)
+        moves = self._moves
+        if idx is None or idx >= len(moves) or moves[idx].get('move_id') != move_id:
+            # moves was edited in place (e.g. a move learned on level up); rebuild the index
+            self._move_index = {m.get('move_id'): i for i, m in enumerate(moves)}
+            idx = self._move_index.get(move_id)
+            if idx is None:
+                return None
+        return moves[idx]
+
     def _generate_starting_moves(self) -> List[str]:
         """
         Generate starting moves based on level and species learnset
@@ -181,11 +225,11 @@ class Pokemon:
         try:
             # Try to load learnset database
             import os
-            from learnset_database import LearnsetDatabase
+            from learnset_database import load_learnsets
             
             learnset_path = 'data/learnsets.json'
             if os.path.exists(learnset_path):
-                learnset_db = LearnsetDatabase(learnset_path)
+                learnset_db = load_learnsets(learnset_path)
                 moves = learnset_db.get_starting_moves(
                     self.species_name,
                     level=self.level,
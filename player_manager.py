@@ -2,66 +2,102 @@
 Player Manager - Handles trainer profile operations
 """
 
-import json
-from pathlib import Path
+import threading
+import time
+from collections import OrderedDict
 from typing import Optional, Dict, List
 from database import PlayerDatabase
 from models import Trainer, Pokemon
 
 
+# Trainers whose item quantities are kept in memory; least recently used are dropped
+INVENTORY_CACHE_SIZE = 1024
+# Pause between trainers in warm_caches so it never monopolizes SQLite
+WARM_CACHE_PAUSE = 0.01
+
+
 class PlayerManager:
     """Manages player/trainer data"""
+
+    # Child tables first, trainers last so delete_player's rowcount is the trainer row
+    _DELETE_PLAYER_SQL = (
+        "DELETE FROM pokemon_instances WHERE owner_discord_id = ?",
+        "DELETE FROM inventory WHERE discord_user_id = ?",
+        "DELETE FROM pokedex WHERE discord_user_id = ?",
+        "DELETE FROM trainers WHERE discord_user_id = ?",
+    )
     
     def __init__(self, db_path: str = "data/players.db", species_db=None, items_db=None):
         self.db = PlayerDatabase(db_path)
         self.species_db = species_db
         self.items_db = items_db
-        self.inventory_cache_path = Path("config/player_inventory.json")
-        self._inventory_cache = self._load_inventory_cache()
+        # Item quantities per trainer (LRU, INVENTORY_CACHE_SIZE entries), loaded
+        # from SQLite on first access and kept in step with add_item/remove_item.
+        # Loads read SQLite without the lock; _inventory_writes lets them detect
+        # a write that landed mid-read, in which case the result isn't stored.
+        self._inventory: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+        self._inventory_lock = threading.Lock()
+        self._inventory_writes = 0
+        # Display names resolved from species_db/items_db; both are static at runtime
+        self._species_names: Dict[int, str] = {}
+        self._item_names: Dict[str, str] = {}
 
     # ------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------
-    def _load_inventory_cache(self) -> Dict[str, Dict[str, int]]:
-        if self.inventory_cache_path.exists():
-            try:
-                with open(self.inventory_cache_path, "r", encoding="utf-8") as cache_file:
-                    data = json.load(cache_file)
-                    if isinstance(data, dict):
-                        return data
-            except (json.JSONDecodeError, OSError):
-                pass
-        return {}
+    def _held_items(self, discord_user_id: int) -> Dict[str, int]:
+        """Copy of a trainer's item quantities, read from SQLite on a cache miss"""
+        with self._inventory_lock:
+            items = self._inventory.get(discord_user_id)
+            if items is not None:
+                self._inventory.move_to_end(discord_user_id)
+                return dict(items)
+            writes = self._inventory_writes
 
-    def _save_inventory_cache(self):
-        self.inventory_cache_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.inventory_cache_path, "w", encoding="utf-8") as cache_file:
-            json.dump(self._inventory_cache, cache_file, indent=2)
+        rows = self.db.get_inventory(discord_user_id)
+        items = {row["item_id"]: row["quantity"] for row in rows}
 
-    def _set_cached_quantity(self, discord_user_id: int, item_id: str, quantity: int):
-        user_key = str(discord_user_id)
-        if quantity <= 0:
-            if user_key in self._inventory_cache and item_id in self._inventory_cache[user_key]:
-                self._inventory_cache[user_key].pop(item_id, None)
-                if not self._inventory_cache[user_key]:
-                    self._inventory_cache.pop(user_key, None)
-        else:
-            self._inventory_cache.setdefault(user_key, {})[item_id] = quantity
-        self._save_inventory_cache()
+        with self._inventory_lock:
+            if self._inventory_writes == writes and discord_user_id not in self._inventory:
+                self._inventory[discord_user_id] = dict(items)
+                if len(self._inventory) > INVENTORY_CACHE_SIZE:
+                    self._inventory.popitem(last=False)
+        return items
 
     def _bump_cached_quantity(self, discord_user_id: int, item_id: str, delta: int):
-        user_key = str(discord_user_id)
-        current = self._inventory_cache.get(user_key, {}).get(item_id, 0)
-        self._set_cached_quantity(discord_user_id, item_id, current + delta)
+        """Apply a quantity change already written to SQLite; caller must hold _inventory_lock"""
+        self._inventory_writes += 1
+        items = self._inventory.get(discord_user_id)
+        if items is None:
+            return  # Not loaded yet; the first read comes straight from SQLite
+        quantity = items.get(item_id, 0) + delta
+        if quantity > 0:
+            items[item_id] = quantity
+        else:
+            items.pop(item_id, None)
+
+    def _items_to_rows(self, discord_user_id: int, items: Dict[str, int]) -> List[Dict]:
+        return [
+            {"discord_user_id": discord_user_id, "item_id": item_id, "quantity": items[item_id]}
+            for item_id in sorted(items)
+        ]
+
+    def _species_name(self, species_dex_number: int) -> str:
+        name = self._species_names.get(species_dex_number)
+        if name is None:
+            species_data = self.species_db.get_species(species_dex_number) if self.species_db else None
+            name = species_data['name'] if species_data else "Pokemon"
+            self._species_names[species_dex_number] = name
+        return name
+
+    def _item_name(self, item_id: str) -> str:
+        name = self._item_names.get(item_id)
+        if name is None:
+            item_data = self.items_db.get_item(item_id) if self.items_db else None
+            name = item_data['name'] if item_data else item_id
+            self._item_names[item_id] = name
+        return name
 
-    def _rows_to_inventory(self, rows: List[Dict]) -> List[Dict]:
-        inventory = []
-        for row in rows:
-            if row.get("quantity", 0) > 0:
-                inventory.append(row)
-                self._set_cached_quantity(row["discord_user_id"], row["item_id"], row["quantity"])
-        return inventory
-    
     # ============================================================
     # TRAINER OPERATIONS
     # ============================================================
@@ -101,6 +137,32 @@ class PlayerManager:
             bane_stat=bane_stat
         )
     
+    def register_new_trainer(self, discord_user_id: int, trainer_name: str, starter_species: Dict,
+                             avatar_url: str = None, boon_stat: str = None,
+                             bane_stat: str = None) -> Optional[str]:
+        """
+        Create a trainer with a level 5 starter of the given species in the first
+        party slot and its Pokedex entry, all in one database transaction
+        
+        Returns:
+            The starter's Pokemon ID, or None if the trainer already exists
+        """
+        starter = Pokemon(
+            species_data=starter_species,
+            level=5,
+            owner_discord_id=discord_user_id
+        )
+        starter.in_party = True
+        starter.party_position = 0
+        return self.db.register_trainer(
+            discord_user_id=discord_user_id,
+            trainer_name=trainer_name,
+            starter_data=starter.to_dict(),
+            avatar_url=avatar_url,
+            boon_stat=boon_stat,
+            bane_stat=bane_stat
+        )
+    
     def update_player(self, discord_user_id: int, **kwargs):
         """Update trainer fields"""
         self.db.update_trainer(discord_user_id, **kwargs)
@@ -116,44 +178,20 @@ class PlayerManager:
         Returns:
             True if successful, False if player not found
         """
-        with self.get_session() as session:
-            trainer = session.query(Trainer).filter_by(discord_user_id=discord_id).first()
-            if trainer:
-                trainer.current_location_id = location_id
-                session.commit()
-                return True
-            return False
+        return self.db.update_trainer(discord_id, current_location_id=location_id) > 0
 
     def delete_player(self, discord_user_id: int) -> bool:
         """Delete a trainer profile and all associated data."""
         conn = self.db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute(
-                "DELETE FROM pokemon_instances WHERE owner_discord_id = ?",
-                (discord_user_id,)
-            )
-            cursor.execute(
-                "DELETE FROM inventory WHERE discord_user_id = ?",
-                (discord_user_id,)
-            )
-            cursor.execute(
-                "DELETE FROM pokedex WHERE discord_user_id = ?",
-                (discord_user_id,)
-            )
-            cursor.execute(
-                "DELETE FROM trainers WHERE discord_user_id = ?",
-                (discord_user_id,)
-            )
-            deleted = cursor.rowcount
-            conn.commit()
-        finally:
-            conn.close()
+        # One write transaction for all four tables; rolled back if any DELETE fails
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for sql in self._DELETE_PLAYER_SQL:
+                deleted = conn.execute(sql, (discord_user_id,)).rowcount
 
-        user_key = str(discord_user_id)
-        if user_key in self._inventory_cache:
-            self._inventory_cache.pop(user_key, None)
-            self._save_inventory_cache()
+        with self._inventory_lock:
+            self._inventory_writes += 1
+            self._inventory.pop(discord_user_id, None)
 
         return deleted > 0
     
@@ -172,16 +210,16 @@ class PlayerManager:
         Returns:
             Pokemon ID
         """
-        # Get current party
-        party = self.get_party(pokemon.owner_discord_id)
+        # Get current party size
+        party_size = self.db.count_party(pokemon.owner_discord_id)
         
-        if len(party) >= 6:
+        if party_size >= 6:
             # Party full, add to box instead
             return self.add_pokemon_to_box(pokemon)
         
         # Set party position
         if position is None:
-            position = len(party)
+            position = party_size
         
         pokemon.in_party = True
         pokemon.party_position = position
@@ -190,10 +228,8 @@ class PlayerManager:
     
     def add_pokemon_to_box(self, pokemon: Pokemon) -> str:
         """Add a Pokemon to storage box"""
-        boxes = self.get_boxes(pokemon.owner_discord_id)
-        
         pokemon.in_party = False
-        pokemon.box_position = len(boxes)
+        pokemon.box_position = self.db.count_boxes(pokemon.owner_discord_id)
         
         return self.db.add_pokemon(pokemon.to_dict())
     
@@ -225,7 +261,7 @@ class PlayerManager:
     
     def get_all_pokemon(self, discord_user_id: int) -> List[Dict]:
         """Get all Pokemon owned by trainer"""
-        return self.get_party(discord_user_id) + self.get_boxes(discord_user_id)
+        return self.db.get_all_pokemon(discord_user_id)
 
     def heal_party(self, discord_user_id: int) -> int:
         """Fully restore every Pokémon currently in the trainer's party."""
@@ -245,42 +281,53 @@ class PlayerManager:
     
     def has_seen_species(self, discord_user_id: int, species_dex_number: int) -> bool:
         """Check if trainer has seen this species"""
-        seen = self.get_pokedex(discord_user_id)
-        return species_dex_number in seen
+        return self.db.has_pokedex_entry(discord_user_id, species_dex_number)
     
     # ============================================================
     # INVENTORY OPERATIONS
     # ============================================================
     
+    def warm_caches(self, days: int = 7) -> int:
+        """
+        Preload inventories and party species names for recently active trainers
+        so their first interactions after a restart skip the cold SQLite reads.
+        Blocking; run it off the event loop. Returns the number of trainers warmed.
+        """
+        trainer_ids = self.db.get_recent_trainer_ids(days, limit=INVENTORY_CACHE_SIZE)
+        for discord_user_id in trainer_ids:
+            self._held_items(discord_user_id)
+            for pokemon in self.get_party(discord_user_id):
+                self._species_name(pokemon['species_dex_number'])
+            time.sleep(WARM_CACHE_PAUSE)
+        return len(trainer_ids)
+
     def get_inventory(self, discord_user_id: int) -> List[Dict]:
         """Get trainer's inventory"""
-        rows = self.db.get_inventory(discord_user_id)
-        inventory = self._rows_to_inventory(rows)
-        if inventory:
-            return inventory
-
-        cached_items = self._inventory_cache.get(str(discord_user_id), {})
-        return [
-            {"discord_user_id": discord_user_id, "item_id": item_id, "quantity": qty}
-            for item_id, qty in cached_items.items()
-            if qty > 0
-        ]
+        return self._items_to_rows(discord_user_id, self._held_items(discord_user_id))
     
+    def get_inventory_items(self, discord_user_id: int, item_ids) -> List[Dict]:
+        """Get trainer's inventory rows for just the given item IDs (e.g. every Poké Ball)"""
+        items = self._held_items(discord_user_id)
+        wanted = {item_id: items[item_id] for item_id in set(item_ids) if item_id in items}
+        return self._items_to_rows(discord_user_id, wanted)
+
     def add_item(self, discord_user_id: int, item_id: str, quantity: int = 1):
         """Add item(s) to trainer's inventory"""
-        self.db.add_item(discord_user_id, item_id, quantity)
-        self._bump_cached_quantity(discord_user_id, item_id, quantity)
+        with self._inventory_lock:
+            self.db.add_item(discord_user_id, item_id, quantity)
+            self._bump_cached_quantity(discord_user_id, item_id, quantity)
 
     def remove_item(self, discord_user_id: int, item_id: str, quantity: int = 1) -> bool:
         """Remove item(s) from trainer's inventory. Returns True if successful."""
-        success = self.db.remove_item(discord_user_id, item_id, quantity)
-        if success:
-            self._bump_cached_quantity(discord_user_id, item_id, -quantity)
+        with self._inventory_lock:
+            success = self.db.remove_item(discord_user_id, item_id, quantity)
+            if success:
+                self._bump_cached_quantity(discord_user_id, item_id, -quantity)
         return success
     
     def get_item_quantity(self, discord_user_id: int, item_id: str) -> int:
         """Get quantity of a specific item"""
-        return self.db.get_item_quantity(discord_user_id, item_id)
+        return self._held_items(discord_user_id).get(item_id, 0)
     
     # ============================================================
     # POKEMON MANAGEMENT OPERATIONS
@@ -308,8 +355,7 @@ class PlayerManager:
             return False, "[X] You must have at least one Pokemon in your party!"
         
         # Get current box count for position
-        boxes = self.get_boxes(discord_user_id)
-        box_position = len(boxes)
+        box_position = self.db.count_boxes(discord_user_id)
         
         # Update Pokemon
         self.db.update_pokemon(pokemon_id, {
@@ -319,17 +365,10 @@ class PlayerManager:
         })
         
         # Reorder party positions
-        for i, p in enumerate(party):
-            if p['pokemon_id'] != pokemon_id:
-                self.db.update_pokemon(p['pokemon_id'], {'party_position': i})
-        
-        species_name = pokemon.get('nickname', '')
-        if not species_name and self.species_db:
-            # Get species name from database
-            species_data = self.species_db.get_species(pokemon['species_dex_number'])
-            species_name = species_data['name'] if species_data else "Pokemon"
-        elif not species_name:
-            species_name = "Pokemon"
+        remaining = [p for p in party if p['pokemon_id'] != pokemon_id]
+        self.db.bulk_update_positions([(i, None, p['pokemon_id']) for i, p in enumerate(remaining)])
+        
+        species_name = pokemon.get('nickname') or self._species_name(pokemon['species_dex_number'])
         
         return True, f"[OK] **{species_name}** was moved to the box!"
     
@@ -349,13 +388,11 @@ class PlayerManager:
         if pokemon.get('in_party'):
             return False, "[X] This Pokemon is already in your party!"
         
-        party = self.get_party(discord_user_id)
+        party_position = self.db.count_party(discord_user_id)
         
-        if len(party) >= 6:
+        if party_position >= 6:
             return False, "[X] Your party is full! Deposit a Pokemon first."
         
-        party_position = len(party)
-        
         # Update Pokemon
         self.db.update_pokemon(pokemon_id, {
             'in_party': 1,
@@ -365,15 +402,9 @@ class PlayerManager:
         
         # Reorder box positions
         boxes = self.get_boxes(discord_user_id)
-        for i, p in enumerate(boxes):
-            self.db.update_pokemon(p['pokemon_id'], {'box_position': i})
+        self.db.bulk_update_positions([(None, i, p['pokemon_id']) for i, p in enumerate(boxes)])
         
-        species_name = pokemon.get('nickname', '')
-        if not species_name and self.species_db:
-            species_data = self.species_db.get_species(pokemon['species_dex_number'])
-            species_name = species_data['name'] if species_data else "Pokemon"
-        elif not species_name:
-            species_name = "Pokemon"
+        species_name = pokemon.get('nickname') or self._species_name(pokemon['species_dex_number'])
         
         return True, f"[OK] **{species_name}** was added to your party!"
     
@@ -390,31 +421,26 @@ class PlayerManager:
         if pokemon['owner_discord_id'] != discord_user_id:
             return False, "[X] This isn't your Pokemon!"
         
-        # Check if this is the last Pokemon in party
-        if pokemon.get('in_party'):
-            party = self.get_party(discord_user_id)
-            if len(party) <= 1:
+        # Read the list the Pokemon sits in once; it's reused to renumber after the delete
+        in_party = bool(pokemon.get('in_party'))
+        if in_party:
+            siblings = self.get_party(discord_user_id)
+            if len(siblings) <= 1:
                 return False, "[X] You cannot release your last Pokemon!"
+        else:
+            siblings = self.get_boxes(discord_user_id)
         
-        species_name = pokemon.get('nickname', '')
-        if not species_name and self.species_db:
-            species_data = self.species_db.get_species(pokemon['species_dex_number'])
-            species_name = species_data['name'] if species_data else "Pokemon"
-        elif not species_name:
-            species_name = "Pokemon"
+        species_name = pokemon.get('nickname') or self._species_name(pokemon['species_dex_number'])
         
         # Delete Pokemon
         self.db.delete_pokemon(pokemon_id)
         
         # Reorder positions
-        if pokemon.get('in_party'):
-            party = self.get_party(discord_user_id)
-            for i, p in enumerate(party):
-                self.db.update_pokemon(p['pokemon_id'], {'party_position': i})
+        remaining = [p['pokemon_id'] for p in siblings if p['pokemon_id'] != pokemon_id]
+        if in_party:
+            self.db.bulk_update_positions([(i, None, pid) for i, pid in enumerate(remaining)])
         else:
-            boxes = self.get_boxes(discord_user_id)
-            for i, p in enumerate(boxes):
-                self.db.update_pokemon(p['pokemon_id'], {'box_position': i})
+            self.db.bulk_update_positions([(None, i, pid) for i, pid in enumerate(remaining)])
         
         return True, f"[OK] **{species_name}** was released. Farewell!"
     
@@ -436,11 +462,7 @@ class PlayerManager:
         if nickname:
             return True, f"[OK] Nickname changed to **{nickname}**!"
         else:
-            if self.species_db:
-                species_data = self.species_db.get_species(pokemon['species_dex_number'])
-                species_name = species_data['name'] if species_data else "Pokemon"
-            else:
-                species_name = "Pokemon"
+            species_name = self._species_name(pokemon['species_dex_number'])
             return True, f"[OK] Nickname reset to **{species_name}**!"
     
     def give_item(self, discord_user_id: int, pokemon_id: str, item_id: str) -> tuple[bool, str]:
@@ -468,11 +490,7 @@ class PlayerManager:
         self.db.update_pokemon(pokemon_id, {'held_item': item_id})
         self.remove_item(discord_user_id, item_id, 1)
         
-        if self.items_db:
-            item_data = self.items_db.get_item(item_id)
-            item_name = item_data['name'] if item_data else item_id
-        else:
-            item_name = item_id
+        item_name = self._item_name(item_id)
         
         return True, f"[OK] Gave **{item_name}** to Pokemon!"
     
@@ -498,11 +516,7 @@ class PlayerManager:
         self.db.update_pokemon(pokemon_id, {'held_item': None})
         self.add_item(discord_user_id, item_id, 1)
         
-        if self.items_db:
-            item_data = self.items_db.get_item(item_id)
-            item_name = item_data['name'] if item_data else item_id
-        else:
-            item_name = item_id
+        item_name = self._item_name(item_id)
         
         return True, f"[OK] Took **{item_name}** from Pokemon!"
     
@@ -527,8 +541,7 @@ class PlayerManager:
         pos1 = pokemon1['party_position']
         pos2 = pokemon2['party_position']
         
-        self.db.update_pokemon(pokemon_id_1, {'party_position': pos2})
-        self.db.update_pokemon(pokemon_id_2, {'party_position': pos1})
+        self.db.swap_party_positions(pokemon_id_1, pokemon_id_2, pos1, pos2)
         
         return True, "[OK] Pokemon positions swapped!"
 
@@ -52,11 +52,14 @@ class PokemonBot(commands.Bot):
         self.natures_db = None
         self.type_chart = None
         
-        # Temp storage for registration flow
-        self.temp_registration_data = {}
+        # In-progress registration flows, keyed by Discord user id
+        self.pending_registrations = {}
 
         # Track the latest rolled encounters per player so they can revisit them
         self.active_encounters = {}
+
+        # Background cache warm-up, started on the first on_ready only
+        self._warm_caches_task = None
     
     async def setup_hook(self):
         """Called when the bot is starting up"""
@@ -133,6 +136,24 @@ class PokemonBot(commands.Bot):
             activity=discord.Game(name="Pokemon | /register to begin!")
         )
 
+        # on_ready fires again after reconnects; warm the player caches once
+        if self._warm_caches_task is None:
+            self._warm_caches_task = asyncio.create_task(self.warm_player_caches())
+
+    async def warm_player_caches(self):
+        """Load recently active trainers' data in a worker thread"""
+        try:
+            warmed = await asyncio.to_thread(self.player_manager.warm_caches)
+            print(f"🔥 Warmed caches for {warmed} recent trainers")
+        except Exception as e:
+            print(f"⚠️ Cache warm-up failed: {e}")
+
+    async def close(self):
+        """Close the player database connection before disconnecting"""
+        if self.player_manager:
+            self.player_manager.db.close()
+        await super().close()
+
 
 # ============================================================
 # MAIN MENU COMMAND
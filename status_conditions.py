@@ -48,7 +48,27 @@ class VolatileStatus(Enum):
     SAND_TOMB = "sandtomb"
     CLAMP = "clamp"
     INFESTATION = "infestation"
-    
+
+
+# Trapping-move volatiles: 1/8 max HP chip each turn until they wear off
+TRAPPING_VOLATILES = frozenset({
+    VolatileStatus.BIND.value, VolatileStatus.WRAP.value,
+    VolatileStatus.FIRE_SPIN.value, VolatileStatus.WHIRLPOOL.value,
+    VolatileStatus.SAND_TOMB.value, VolatileStatus.CLAMP.value,
+    VolatileStatus.INFESTATION.value,
+})
+
+# Volatiles whose duration apply_end_of_turn_effects ticks in its own branch
+_SELF_TICKED_VOLATILES = TRAPPING_VOLATILES | {
+    VolatileStatus.CONFUSION.value, VolatileStatus.LEECH_SEED.value,
+}
+
+# Fixed residual chip from a major status: status -> (max HP divisor, message)
+_STATUS_CHIP = {
+    StatusType.BURN.value: (16, "was hurt by its burn!"),
+    StatusType.POISON.value: (8, "was hurt by poison!"),
+}
+
 
 @dataclass
 class StatusCondition:
@@ -180,21 +200,21 @@ class StatusConditionManager:
         Apply end-of-turn status effects
         Returns list of messages describing what happened
         """
+        if not self.major_status and not self.volatile_statuses:
+            return []
+
         messages = []
         
         # Major status effects
         if self.major_status:
             status = self.major_status.status_type
+            chip = _STATUS_CHIP.get(status)
             
-            if status == StatusType.BURN.value:
-                damage = max(1, pokemon.max_hp // 16)
-                pokemon.current_hp = max(0, pokemon.current_hp - damage)
-                messages.append(f"{pokemon.species_name} was hurt by its burn! (-{damage} HP)")
-            
-            elif status == StatusType.POISON.value:
-                damage = max(1, pokemon.max_hp // 8)
+            if chip is not None:
+                divisor, text = chip
+                damage = max(1, pokemon.max_hp // divisor)
                 pokemon.current_hp = max(0, pokemon.current_hp - damage)
-                messages.append(f"{pokemon.species_name} was hurt by poison! (-{damage} HP)")
+                messages.append(f"{pokemon.species_name} {text} (-{damage} HP)")
             
             elif status == StatusType.BADLY_POISON.value:
                 self.major_status.counter += 1
@@ -226,10 +246,7 @@ class StatusConditionManager:
                     messages.append(f"{status.source.species_name} absorbed HP! (+{heal} HP)")
             
             # Remove trapping move volatiles after turn
-            elif status_name in [VolatileStatus.BIND.value, VolatileStatus.WRAP.value,
-                                VolatileStatus.FIRE_SPIN.value, VolatileStatus.WHIRLPOOL.value,
-                                VolatileStatus.SAND_TOMB.value, VolatileStatus.CLAMP.value,
-                                VolatileStatus.INFESTATION.value]:
+            elif status_name in TRAPPING_VOLATILES:
                 damage = max(1, pokemon.max_hp // 8)
                 pokemon.current_hp = max(0, pokemon.current_hp - damage)
                 messages.append(f"{pokemon.species_name} is hurt by {status_name.replace('_', ' ').title()}! (-{damage} HP)")
@@ -241,11 +258,7 @@ class StatusConditionManager:
 
         # Generic duration tick for any other temporaries (e.g., endure, protect)
         for name, status in list(self.volatile_statuses.items()):
-            if name not in [VolatileStatus.CONFUSION.value, VolatileStatus.LEECH_SEED.value,
-                            VolatileStatus.BIND.value, VolatileStatus.WRAP.value,
-                            VolatileStatus.FIRE_SPIN.value, VolatileStatus.WHIRLPOOL.value,
-                            VolatileStatus.SAND_TOMB.value, VolatileStatus.CLAMP.value,
-                            VolatileStatus.INFESTATION.value]:
+            if name not in _SELF_TICKED_VOLATILES:
                 if status.tick_turn():
                     del self.volatile_statuses[name]
 
@@ -0,0 +1,72 @@
+import contextlib
+import io
+import unittest
+
+from battle_engine_v2 import BattleEngine
+from database import ItemsDatabase, MovesDatabase, SpeciesDatabase, TypeChart
+from models import Pokemon
+from status_conditions import StatusConditionManager, StatusType
+
+
+class EndOfTurnTests(unittest.TestCase):
+    """End of turn runs weather, then items, then status, each fastest first."""
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.species_db = SpeciesDatabase('data/pokemon_species.json')
+            cls.engine = BattleEngine(
+                MovesDatabase('data/moves.json'),
+                TypeChart('data/type_chart.json'),
+                cls.species_db,
+                items_db=ItemsDatabase('data/items.json'),
+            )
+
+    def start_battle(self):
+        # Pikachu (speed 96) on the trainer side, Snorlax (speed 37) on the opponent side
+        fast = Pokemon(self.species_db.get_species(25), level=50, nature='hardy', moves=['tackle'])
+        slow = Pokemon(self.species_db.get_species(143), level=50, nature='hardy', moves=['tackle'])
+        battle_id = self.engine.start_pvp_battle(1, 'Fast', [fast], 2, 'Slow', [slow])
+        battle = self.engine.get_battle(battle_id)
+        battle.weather = 'sandstorm'
+        battle.weather_turns = 5
+        return battle, fast, slow
+
+    def test_double_ko_resolves_phase_by_phase_in_speed_order(self):
+        battle, fast, slow = self.start_battle()
+        fast.status_manager = StatusConditionManager()
+        fast.status_manager.apply_status(StatusType.BURN.value)
+        # Pikachu survives the sandstorm but not the burn after it; Snorlax falls to the sandstorm
+        fast.current_hp = fast.max_hp // 16 + 1
+        slow.current_hp = 1
+
+        messages = self.engine._process_end_of_turn(battle)
+
+        self.assertEqual(messages, [
+            f"Pikachu is buffeted by the sandstorm! (-{fast.max_hp // 16} HP)",
+            f"Snorlax is buffeted by the sandstorm! (-{slow.max_hp // 16} HP)",
+            f"Pikachu was hurt by its burn! (-{fast.max_hp // 16} HP)",
+        ])
+        self.assertEqual((fast.current_hp, slow.current_hp), (0, 0))
+
+        self.engine._check_battle_end(battle)
+        self.assertTrue(battle.is_over)
+        self.assertEqual(battle.winner, 'draw')
+
+    def test_only_the_side_left_standing_wins(self):
+        battle, fast, slow = self.start_battle()
+        fast.current_hp = fast.max_hp // 16 + 1
+        slow.current_hp = 1
+
+        messages = self.engine._process_end_of_turn(battle)
+
+        self.assertEqual([m.split(' is ')[0] for m in messages], ['Pikachu', 'Snorlax'])
+        self.assertEqual((fast.current_hp, slow.current_hp), (1, 0))
+
+        self.engine._check_battle_end(battle)
+        self.assertTrue(battle.is_over)
+        self.assertEqual(battle.winner, 'trainer')
+
+
+if __name__ == '__main__':
+    unittest.main()
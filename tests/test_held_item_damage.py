@@ -0,0 +1,78 @@
+import contextlib
+import io
+import random
+import unittest
+
+from battle_engine_v2 import HeldItemManager
+from database import ItemsDatabase, MovesDatabase, SpeciesDatabase
+from models import Pokemon
+
+
+class HeldItemDamageTests(unittest.TestCase):
+    """Pins item-modified damage to the integer round-half-up rule."""
+
+    @classmethod
+    def setUpClass(cls):
+        with contextlib.redirect_stdout(io.StringIO()):
+            cls.species_db = SpeciesDatabase('data/pokemon_species.json')
+            cls.moves_db = MovesDatabase('data/moves.json')
+            cls.items = HeldItemManager(ItemsDatabase('data/items.json'))
+        cls.tackle = cls.moves_db.get_move('tackle')
+        cls.flamethrower = cls.moves_db.get_move('flamethrower')
+
+    def make_pokemon(self, held_item=None):
+        pokemon = Pokemon(self.species_db.get_species(6), level=50, nature='hardy', moves=['tackle'])
+        pokemon.held_item = held_item
+        return pokemon
+
+    def modify(self, attacker_item, defender_item, move, damage, seed=0):
+        return self.items.modify_damage(
+            self.make_pokemon(attacker_item),
+            self.make_pokemon(defender_item),
+            move,
+            damage,
+            random.Random(seed),
+        )
+
+    def test_attacker_boosts_round_half_up(self):
+        self.assertEqual(self.modify('life_orb', None, self.tackle, 100), (130, ()))
+        self.assertEqual(self.modify('life_orb', None, self.tackle, 33), (43, ()))
+        # Halves round up: 5 * 1.3 = 6.5 and 35 * 1.5 = 52.5. The old int(round(...)) rounded
+        # halves to even and gave 6 and 52
+        self.assertEqual(self.modify('life_orb', None, self.tackle, 5), (7, ()))
+        self.assertEqual(self.modify('choice_band', None, self.tackle, 35), (53, ()))
+        self.assertEqual(self.modify('choice_band', None, self.tackle, 33), (50, ()))
+        self.assertEqual(self.modify('choice_specs', None, self.flamethrower, 33), (50, ()))
+        self.assertEqual(self.modify('charcoal', None, self.flamethrower, 33), (40, ()))
+
+    def test_boosts_only_apply_to_matching_moves(self):
+        self.assertEqual(self.modify('choice_band', None, self.flamethrower, 33), (33, ()))
+        self.assertEqual(self.modify('charcoal', None, self.tackle, 33), (33, ()))
+
+    def test_defender_items_fold_into_one_ratio(self):
+        self.assertEqual(self.modify(None, 'assault_vest', self.flamethrower, 100), (67, ()))
+        self.assertEqual(self.modify(None, 'assault_vest', self.tackle, 100), (100, ()))
+        # Choice Specs x1.5 and Assault Vest x2/3 cancel exactly; rounding each side separately
+        # used to give round(49.5) = 50, then ceil(50 / 1.5) = 34
+        self.assertEqual(self.modify('choice_specs', 'assault_vest', self.flamethrower, 33), (33, ()))
+        self.assertEqual(self.modify('life_orb', 'assault_vest', self.flamethrower, 1), (1, ()))
+
+    def test_focus_band_uses_the_given_rng(self):
+        defender = self.make_pokemon('focus_band')
+        hp = defender.current_hp
+
+        # Random(0).random() = 0.84 > 0.1: no activation
+        damage, messages = self.items.modify_damage(
+            self.make_pokemon(), defender, self.tackle, hp + 10, random.Random(0))
+        self.assertEqual((damage, messages), (hp + 10, ()))
+
+        # Activation chance 0.1; find a seed whose first draw is under it
+        seed = next(s for s in range(100) if random.Random(s).random() <= 0.1)
+        damage, messages = self.items.modify_damage(
+            self.make_pokemon(), defender, self.tackle, hp + 10, random.Random(seed))
+        self.assertEqual(damage, hp - 1)
+        self.assertEqual(len(messages), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+from database import PlayerDatabase
+
+
+class PlayerDatabaseConnectionTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = PlayerDatabase(os.path.join(self.tmpdir, 'players.db'))
+        self.db.create_trainer(1, 'Red')
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def test_failed_write_rolls_back_and_releases_the_lock(self):
+        with self.assertRaises(RuntimeError):
+            with self.db._tx() as cursor:
+                cursor.execute("UPDATE trainers SET money = 1 WHERE discord_user_id = 1")
+                raise RuntimeError("boom")
+
+        self.assertFalse(self.db.get_connection().in_transaction)
+        self.assertNotEqual(self.db.get_trainer(1)['money'], 1)
+
+        # Another thread's connection can still write straight away
+        errors = []
+
+        def write():
+            try:
+                self.db.add_item(1, 'potion', 2)
+            except Exception as e:
+                errors.append(e)
+
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.db.get_item_quantity(1, 'potion'), 2)
+
+    def test_close_shuts_down_every_thread_connection(self):
+        opened = []
+        thread = threading.Thread(target=lambda: opened.append(self.db.get_connection()))
+        thread.start()
+        thread.join()
+        main = self.db.get_connection()
+
+        self.db.close()
+
+        for conn in (main, opened[0]):
+            with self.assertRaises(Exception):
+                conn.execute("SELECT 1")
+        # The next call on this thread opens a fresh connection
+        self.assertIsNotNone(self.db.get_trainer(1))
+
+    def test_recent_trainers_come_most_recent_first_and_respect_the_limit(self):
+        for discord_user_id, name in ((2, 'Blue'), (3, 'Green'), (4, 'Gold')):
+            self.db.create_trainer(discord_user_id, name)
+        with self.db._tx() as cursor:
+            cursor.executemany(
+                "UPDATE trainers SET updated_at = datetime('now', ?) WHERE discord_user_id = ?",
+                [('-3 hours', 1), ('-1 hours', 2), ('-2 hours', 3), ('-30 days', 4)],
+            )
+
+        self.assertEqual(self.db.get_recent_trainer_ids(7), [2, 3, 1])
+        self.assertEqual(self.db.get_recent_trainer_ids(7, limit=2), [2, 3])
+
+
+class BulkUpdatePositionsTests(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.db = PlayerDatabase(os.path.join(self.tmpdir, 'players.db'))
+        self.db.create_trainer(1, 'Red')
+        self.pokemon_id = self.db.add_pokemon({
+            'owner_discord_id': 1, 'species_dex_number': 25, 'level': 5,
+            'nature': 'hardy', 'ability': 'static', 'in_party': 1,
+            'party_position': 2, 'box_position': 7,
+            'max_hp': 20, 'current_hp': 20, 'moves': [],
+        })
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.tmpdir)
+
+    def positions(self):
+        pokemon = self.db.get_pokemon(self.pokemon_id)
+        return pokemon['party_position'], pokemon['box_position']
+
+    def test_party_reorder_leaves_box_position_alone(self):
+        self.assertTrue(self.db.bulk_update_positions([(0, None, self.pokemon_id)]))
+        self.assertEqual(self.positions(), (0, 7))
+
+    def test_box_reorder_leaves_party_position_alone(self):
+        self.assertTrue(self.db.bulk_update_positions([(None, 3, self.pokemon_id)]))
+        self.assertEqual(self.positions(), (2, 3))
+
+    def test_nothing_to_write(self):
+        self.assertFalse(self.db.bulk_update_positions([(None, None, self.pokemon_id)]))
+        self.assertEqual(self.positions(), (2, 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
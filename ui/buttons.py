@@ -388,12 +388,13 @@ class RegistrationView(View):
 class StarterSelectView(View):
     """Starter Pokemon selection with pagination and manual entry"""
 
-    def __init__(self, species_db, selection_future, page: int = 0):
+    def __init__(self, species_db, selection_future, page: int = 0, starters: Optional[List[Dict]] = None):
         super().__init__(timeout=300)
         self.species_db = species_db
         self.selection_future = selection_future
         self.page = page
-        self.starters = species_db.get_all_starters()
+        # Page changes hand the list on rather than asking the species DB again
+        self.starters = starters if starters is not None else species_db.get_all_starters()
         self.selected_species = None
         self.per_page = 25
         self.total_pages = max(1, (len(self.starters) + self.per_page - 1) // self.per_page)
@@ -505,7 +506,7 @@ class StarterSelectView(View):
 
         if self.page > 0:
             self.page -= 1
-            new_view = StarterSelectView(self.species_db, self.selection_future, self.page)
+            new_view = StarterSelectView(self.species_db, self.selection_future, self.page, self.starters)
             new_view.message = interaction.message
             await interaction.response.edit_message(view=new_view)
             self.stop()
@@ -521,7 +522,7 @@ class StarterSelectView(View):
 
         if self.page < self.total_pages - 1:
             self.page += 1
-            new_view = StarterSelectView(self.species_db, self.selection_future, self.page)
+            new_view = StarterSelectView(self.species_db, self.selection_future, self.page, self.starters)
             new_view.message = interaction.message
             await interaction.response.edit_message(view=new_view)
             self.stop()